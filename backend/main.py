@@ -12,22 +12,28 @@ from fastapi import (
     Request,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Set
 import os
 import shutil
 import uuid
 import asyncio
-import json
+import contextlib
+import errno
+import functools
+import hashlib
 import logging
+import sqlite3
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import re
-import sys
-from io import StringIO
-import time
-import random
+import aiofiles
+import orjson
 
 # Setup custom upload size limits
 from starlette.requests import Request
@@ -37,20 +43,41 @@ from tempfile import SpooledTemporaryFile
 # Extend default upload file size to 2GB (2000MB)
 MAX_UPLOAD_SIZE = 2000 * 1024 * 1024  # 2GB in bytes
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Page cache hints for uploaded files are only available on some platforms (e.g. Linux)
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# Kernel-side copying of spooled uploads is only available on Linux
+HAS_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+
+# Worker threads shared by all jobs for Whisper, TTS and moviepy work, so
+# concurrent jobs can't oversubscribe the CPU
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "4"))
+MEDIA_EXECUTOR = ThreadPoolExecutor(
+    max_workers=MEDIA_WORKERS, thread_name_prefix="media"
+)
+
+# Size of the writes used to stream raw audio into ffmpeg's stdin
+FFMPEG_PIPE_CHUNK_SIZE = 1024 * 1024
+
 # Import the video_voiceover functionality
 from video_voiceover import (
-    extract_audio_from_video,
-    transcribe_audio,
+    transcribe_video,
     generate_tts_for_segments,
-    create_composite_voiceover,
+    mix_voiceover,
     create_final_video,
+    copy_mux_args,
+    probe_duration,
     save_srt_file,
-    list_available_voices,
+    fetch_voices,
     VOICE_SETTINGS,
+    FFMPEG_BINARY,
+    VOICEOVER_SAMPLE_RATE,
+    VOICEOVER_CHANNELS,
 )
-
-# Import ElevenLabs SDK
-from elevenlabs import set_api_key
+from moviepy.audio.AudioClip import AudioArrayClip
 
 # Set up logging
 logging.basicConfig(
@@ -78,7 +105,11 @@ UPLOAD_DIR = os.path.join(os.getcwd(), "media", "uploads")
 OUTPUT_DIR = os.path.join(os.getcwd(), "media", "outputs")
 TEMP_DIR = os.path.join(os.getcwd(), "media", "temp")
 
-for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR]:
+# Server state that must not be reachable through the /media static mount
+DATA_DIR = os.path.join(os.getcwd(), "data")
+TTS_CACHE_DIR = os.path.join(DATA_DIR, "tts_cache")
+
+for directory in [UPLOAD_DIR, OUTPUT_DIR, TEMP_DIR, DATA_DIR, TTS_CACHE_DIR]:
     os.makedirs(directory, exist_ok=True)
 
 # Mount the media directory for file downloads
@@ -104,11 +135,334 @@ class Job(BaseModel):
     current_activity: Optional[str] = None  # Added field for detailed status message
 
 
-# In-memory job storage (replace with database in production)
-jobs = {}
+# ElevenLabs API keys are at least 32 characters, either plain hex or "sk_"-prefixed
+API_KEY_RE = re.compile(r"[A-Za-z0-9_-]{32,}")
+
+# Seconds a fetched voice list is reused for the same API key
+VOICES_CACHE_TTL = 300
+
+# Voice lists by API key hash, as (expiry time, voices)
+voices_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+# Number of shards the in-memory job cache is split into
+NUM_SHARDS = 16
+
+# SQLite database that keeps job records across restarts
+JOBS_DB_PATH = os.path.join(DATA_DIR, "jobs.db")
+
+# Job fields kept out of the job records, in their own table, until the job
+# finishes and they are no longer needed
+SECRET_JOB_FIELDS = ("_elevenlabs_api_key",)
+
+# Server-side job fields that are never sent to clients
+PRIVATE_JOB_FIELDS = SECRET_JOB_FIELDS + ("_upload_path",)
+
+# Job statuses after which a job's secret fields are deleted
+FINISHED_JOB_STATUSES = ("completed", "error")
+
+# Jobs not accessed for this long are dropped from memory (they stay in SQLite)
+JOB_CACHE_TTL = 10 * 60  # seconds
+
+# How often changed jobs are written back to SQLite and idle ones evicted
+JOB_FLUSH_INTERVAL = 5  # seconds
+
+# Job statuses a restart can't resume from
+RESUMABLE_STATUSES = ["transcription_complete", "completed", "error"]
+
+
+class JobStore:
+    """Job records in SQLite, fronted by an in-memory cache sharded by job ID.
+
+    Supports the dict operations the endpoints use on individual jobs. Reads
+    are served from memory and fall back to SQLite; changed jobs are marked
+    with `mark_dirty(job_id)` and written back by `flush()`. Use `all()` for
+    a snapshot of every job and `lock(job_id)` to make a check-and-update of
+    a job's status atomic. SECRET_JOB_FIELDS are stored apart from the job
+    records, in the job_secrets table.
+    """
+
+    def __init__(self, db_path: str, num_shards: int = NUM_SHARDS):
+        self._shards: List[Dict[str, Dict[str, Any]]] = [
+            dict() for _ in range(num_shards)
+        ]
+        self._locks = [asyncio.Lock() for _ in range(num_shards)]
+        self._last_access: Dict[str, float] = {}
+        # flush() runs in a worker thread while the loop marks jobs dirty
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+
+        # Worker threads update jobs too, so the connection is shared behind a lock
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                progress REAL,
+                rev INTEGER NOT NULL DEFAULT 0,
+                record BLOB NOT NULL,
+                updated_at REAL
+            )""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS job_secrets (
+                job_id TEXT PRIMARY KEY,
+                record BLOB NOT NULL
+            )""")
+
+    def _index(self, job_id: str) -> int:
+        return hash(job_id) % len(self._shards)
+
+    def _shard(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        return self._shards[self._index(job_id)]
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        shard = self._shard(job_id)
+        job = shard.get(job_id)
+        if job is None:
+            with self._db_lock:
+                row = self._db.execute(
+                    """SELECT jobs.record, job_secrets.record FROM jobs
+                    LEFT JOIN job_secrets USING (job_id) WHERE job_id = ?""",
+                    (job_id,),
+                ).fetchone()
+            if row is None:
+                return None
+            job = orjson.loads(row[0])
+            if row[1] is not None:
+                job.update(orjson.loads(row[1]))
+            job = shard.setdefault(job_id, job)
+        self._last_access[job_id] = time.monotonic()
+        return job
+
+    def __contains__(self, job_id: str) -> bool:
+        return self._load(job_id) is not None
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        job = self._load(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def __setitem__(self, job_id: str, job: Dict[str, Any]):
+        self._shard(job_id)[job_id] = job
+        self._last_access[job_id] = time.monotonic()
+        self.mark_dirty(job_id)
+
+    def get(self, job_id: str, default=None):
+        job = self._load(job_id)
+        return default if job is None else job
+
+    def lock(self, job_id: str) -> asyncio.Lock:
+        return self._locks[self._index(job_id)]
+
+    def mark_dirty(self, job_id: str):
+        with self._dirty_lock:
+            self._dirty.add(job_id)
+
+    def collect_dirty(self):
+        """Snapshot every changed job for `write()`. Call on the event loop.
+
+        The snapshots are serialized here, on the thread that changes the jobs,
+        so `write()` can run in a worker thread without reading live job dicts.
+        Finished jobs have their secret fields dropped.
+        """
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        rows = []
+        secret_rows = []
+        finished = []
+        for job_id in dirty:
+            job = self._shard(job_id).get(job_id)
+            if job is None:
+                continue
+            if job.get("status") in FINISHED_JOB_STATUSES:
+                for key in SECRET_JOB_FIELDS:
+                    job.pop(key, None)
+                finished.append((job_id,))
+            record = {
+                key: value for key, value in job.items() if key not in SECRET_JOB_FIELDS
+            }
+            rows.append(
+                (
+                    job_id,
+                    job.get("status"),
+                    job.get("progress"),
+                    job.get("_rev", 0),
+                    orjson.dumps(record, option=ORJSON_OPTIONS),
+                    time.time(),
+                )
+            )
+            secrets = {key: job[key] for key in SECRET_JOB_FIELDS if key in job}
+            if secrets:
+                secret_rows.append((job_id, orjson.dumps(secrets)))
+        return rows, secret_rows, finished
+
+    def write(self, batch):
+        """Write a batch from `collect_dirty()` to SQLite in one transaction.
+
+        If the write fails, its jobs are marked dirty again for the next flush.
+        """
+        rows, secret_rows, finished = batch
+        if not rows:
+            return
+
+        try:
+            with self._db_lock:
+                self._db.execute("BEGIN")
+                try:
+                    # Upsert rather than replace so jobs keep their creation order
+                    self._db.executemany(
+                        """INSERT INTO jobs (job_id, status, progress, rev, record, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(job_id) DO UPDATE SET
+                            status = excluded.status,
+                            progress = excluded.progress,
+                            rev = excluded.rev,
+                            record = excluded.record,
+                            updated_at = excluded.updated_at""",
+                        rows,
+                    )
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO job_secrets (job_id, record) VALUES (?, ?)",
+                        secret_rows,
+                    )
+                    self._db.executemany(
+                        "DELETE FROM job_secrets WHERE job_id = ?", finished
+                    )
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+        except Exception:
+            with self._dirty_lock:
+                self._dirty.update(row[0] for row in rows)
+            raise
 
-# WebSocket connections for real-time updates
-active_connections: Dict[str, List[WebSocket]] = {}
+    def flush(self):
+        """Write every changed job back to SQLite, on the calling thread."""
+        self.write(self.collect_dirty())
+
+    def evict_idle(self, max_idle: float = JOB_CACHE_TTL):
+        """Drop jobs that haven't been accessed for max_idle seconds from memory."""
+        cutoff = time.monotonic() - max_idle
+        with self._dirty_lock:
+            dirty = set(self._dirty)
+        for job_id, last_access in list(self._last_access.items()):
+            if last_access < cutoff and job_id not in dirty:
+                self._shard(job_id).pop(job_id, None)
+                del self._last_access[job_id]
+
+    def fail_interrupted(self):
+        """Mark jobs that were still processing when the server stopped as failed."""
+        placeholders = ", ".join("?" for _ in RESUMABLE_STATUSES)
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT job_id FROM jobs WHERE status NOT IN ({placeholders})",
+                RESUMABLE_STATUSES,
+            ).fetchall()
+        for (job_id,) in rows:
+            job = self[job_id]
+            job["status"] = "error"
+            job["error"] = "The server restarted while this job was processing"
+            job["current_activity"] = f"Error: {job['error']}"
+            job["finished_at"] = datetime.now().isoformat()
+            self.mark_dirty(job_id)
+        self.flush()
+        return len(rows)
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        # Changed jobs are still in memory and take precedence, so nothing
+        # needs flushing first
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT job_id, record FROM jobs ORDER BY rowid"
+            ).fetchall()
+        merged = {job_id: orjson.loads(record) for job_id, record in rows}
+        for shard in self._shards:
+            merged.update(shard)
+        return merged
+
+
+# Job storage, persisted to SQLite with recently used jobs kept in memory
+jobs = JobStore(JOBS_DB_PATH)
+
+# WebSocket connections for real-time updates, each with its own outgoing message queue
+active_connections: Dict[str, List[Tuple[WebSocket, asyncio.Queue]]] = {}
+
+# Maximum number of WebSocket clients that may follow a single job
+MAX_CONNECTIONS_PER_JOB = 32
+
+# Large job fields that rarely change; status broadcasts leave them out unless
+# they were just updated, and clients fetch them from the payload endpoint
+JOB_PAYLOAD_FIELDS = ("transcription",)
+
+# Maximum number of pending messages buffered per WebSocket client
+CLIENT_QUEUE_SIZE = 32
+
+# orjson options shared by WebSocket messages and JSON responses
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Overall job progress reached at each pipeline stage reported by video_voiceover
+STAGE_PROGRESS = {
+    # Audio extraction phase - 0-15%
+    "extracting_audio": 5,
+    "audio_extracted": 15,
+    # Transcription phase - 15-40%
+    "loading_whisper": 18,
+    "whisper_loaded": 20,
+    "transcribing": 30,
+    "transcription_completed": 40,
+    # TTS generation phase - 40-80%
+    "generating_tts": 45,
+    "tts_segment": 55,
+    "voiceover_assembly": 70,
+    "voiceover_completed": 80,
+    # Final video creation - 80-100%
+    "creating_video": 85,
+    "encoding_video": 95,
+    "video_completed": 100,
+}
+
+# Fallback progress for messages without a stage, by current job status
+STATUS_PROGRESS = {
+    "extracting_audio": 8,
+    "transcribing": 25,
+    "transcription_complete": 40,
+    "transcription_confirmed": 45,
+    "generating_tts": 60,
+    "creating_voiceover": 75,
+    "creating_video": 90,
+    "adjusting_speed": 85,
+    "creating_adjusted_video": 95,
+}
+
+# Seconds over which job updates are merged before being sent to clients
+BROADCAST_INTERVAL = 0.1
+
+# Job updates waiting for the next broadcast, and the timer that will send them
+pending_broadcasts: Dict[str, Dict[str, Any]] = {}
+broadcast_handle: Optional[asyncio.TimerHandle] = None
+
+# Event loop serving the app, set on startup
+main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Background task that writes job changes back to SQLite, set on startup
+job_store_task: Optional[asyncio.Task] = None
+
+# Maximum number of jobs allowed in each pipeline stage at once
+STAGE_CONCURRENCY = {
+    "tts": int(os.getenv("TTS_JOB_SLOTS", "4")),
+    "compose": int(os.getenv("COMPOSE_JOB_SLOTS", "2")),
+    "mux": int(os.getenv("MUX_JOB_SLOTS", "2")),
+}
+
+# Per-stage semaphores, created on startup so they belong to the serving loop
+stage_slots: Dict[str, asyncio.Semaphore] = {}
+
+# Running pipeline tasks, referenced here so they aren't garbage collected
+processing_tasks: Set[asyncio.Task] = set()
 
 # Status messages for different job states
 statusMessages = {
@@ -128,31 +482,115 @@ statusMessages = {
 
 
 # Helper functions
-async def broadcast_job_update(job_id: str, data: dict):
-    """Send job updates to all connected WebSocket clients for this job."""
+def encode_message(data: dict) -> str:
+    """Serialize a WebSocket message once so it can be sent to any number of clients."""
+    return orjson.dumps(data, option=ORJSON_OPTIONS).decode()
+
+
+def enqueue_client_message(queue: asyncio.Queue, message: str, job_id: str):
+    """Queue an encoded message for a WebSocket client without waiting on the client."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # The client has fallen behind. Pending updates are deltas, so dropping
+        # any of them could lose a payload field for good; replace them all
+        # with the job's complete state instead
+        while not queue.empty():
+            queue.get_nowait()
+        job = jobs.get(job_id)
+        queue.put_nowait(message if job is None else encode_message(public_job(job)))
+
+
+async def client_writer(websocket: WebSocket, queue: asyncio.Queue, job_id: str):
+    """Send queued messages to a single WebSocket client."""
+    try:
+        while True:
+            message = await queue.get()
+            await websocket.send_text(message)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Error sending to WebSocket for job {job_id}: {str(e)}")
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a job's record without the fields only the server may see."""
+    return {key: value for key, value in job.items() if key not in PRIVATE_JOB_FIELDS}
+
+
+def job_meta(job: Dict[str, Any], include=()) -> Dict[str, Any]:
+    """Return a job's record without its payload fields, unless listed in include."""
+    meta = {
+        key: value
+        for key, value in job.items()
+        if (key not in JOB_PAYLOAD_FIELDS or key in include)
+        and key not in PRIVATE_JOB_FIELDS
+    }
+    meta["type"] = "meta"
+    return meta
+
+
+def job_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the payload fields of a job's record."""
+    payload = {key: job[key] for key in JOB_PAYLOAD_FIELDS if key in job}
+    payload["job_id"] = job["job_id"]
+    payload["_rev"] = job.get("_rev", 0)
+    payload["type"] = "payload"
+    return payload
+
+
+def bump_revision(job_id: str):
+    """Mark a job as changed so clients holding an older revision resync."""
+    job = jobs[job_id]
+    job["_rev"] = job.get("_rev", 0) + 1
+    jobs.mark_dirty(job_id)
+
+
+def broadcast_job_update(job_id: str, data: dict):
+    """Queue a job update for all connected WebSocket clients for this job."""
     if job_id in active_connections:
         connection_count = len(active_connections[job_id])
         logger.info(
             f"Broadcasting update for job {job_id} to {connection_count} client(s): status={data.get('status')}, progress={data.get('progress')}, activity={data.get('current_activity')}"
         )
-        for connection in active_connections[job_id]:
-            try:
-                await connection.send_json(data)
-            except Exception as e:
-                logger.error(f"Error broadcasting to WebSocket: {e}")
+        # Encode once and share the same payload with every subscriber
+        payload = encode_message(data)
+        for _, queue in active_connections[job_id]:
+            enqueue_client_message(queue, payload, job_id)
     else:
         logger.warning(
             f"No active connections for job {job_id}, update not broadcasted"
         )
 
 
-# Create a separate function to run the broadcast in the background
-async def run_broadcast(job_id: str, data: dict):
-    """Run broadcast as a separate task to ensure it completes."""
-    try:
-        await broadcast_job_update(job_id, data)
-    except Exception as e:
-        logger.error(f"Error in background broadcast task: {e}")
+def queue_job_broadcast(job_id: str, data: dict):
+    """Merge a job update into the pending broadcast for that job.
+
+    Pending updates are sent together once per BROADCAST_INTERVAL, so a burst of
+    status changes reaches each client as a single message. Must be called on
+    the event loop.
+    """
+    global broadcast_handle
+    pending = pending_broadcasts.get(job_id)
+    if pending is None:
+        pending_broadcasts[job_id] = data
+    else:
+        # Later updates carry the newer meta; payload fields accumulate
+        pending.update(data)
+    if broadcast_handle is None:
+        broadcast_handle = asyncio.get_running_loop().call_later(
+            BROADCAST_INTERVAL, flush_job_broadcasts
+        )
+
+
+def flush_job_broadcasts():
+    """Send every pending job update to its clients."""
+    global broadcast_handle
+    broadcast_handle = None
+    updates = pending_broadcasts.copy()
+    pending_broadcasts.clear()
+    for job_id, data in updates.items():
+        broadcast_job_update(job_id, data)
 
 
 def update_job_status(
@@ -165,156 +603,142 @@ def update_job_status(
     **kwargs,
 ):
     """Update job status and broadcast the update to all connected clients."""
-    if job_id in jobs:
-        prev_status = jobs[job_id].get("status")
-        prev_progress = jobs[job_id].get("progress", 0)
-        prev_activity = jobs[job_id].get("current_activity", "")
-
-        # Check if this is a meaningful update
-        has_status_change = status != prev_status
-        has_progress_change = (
-            progress is not None and abs(progress - prev_progress) >= 1
-        )
-        has_activity_change = (
-            current_activity is not None and current_activity != prev_activity
+    job = jobs.get(job_id)
+    if job is None:
+        return None
+
+    prev_status = job.get("status")
+    prev_progress = job.get("progress", 0)
+    prev_activity = job.get("current_activity", "")
+
+    # Check if this is a meaningful update
+    has_status_change = status != prev_status
+    has_progress_change = progress is not None and abs(progress - prev_progress) >= 1
+    has_activity_change = (
+        current_activity is not None and current_activity != prev_activity
+    )
+
+    if has_status_change or has_progress_change or has_activity_change:
+        logger.info(
+            f"Updating job {job_id} status: {prev_status} -> {status}, progress: {prev_progress} -> {progress}, activity: {prev_activity} -> {current_activity}"
         )
 
-        if has_status_change or has_progress_change or has_activity_change:
-            logger.info(
-                f"Updating job {job_id} status: {prev_status} -> {status}, progress: {prev_progress} -> {progress}, activity: {prev_activity} -> {current_activity}"
-            )
+        job["status"] = status
+        if progress is not None:
+            job["progress"] = progress
+        if error:
+            job["error"] = error
+        if finished_at:
+            job["finished_at"] = finished_at
+        if current_activity:
+            job["current_activity"] = current_activity
+
+        # Update any additional fields
+        for key, value in kwargs.items():
+            job[key] = value
+
+        bump_revision(job_id)
+
+        # Clients merge updates into the job they already have, so only send
+        # the small fields plus any payload fields changed by this update
+        update = job_meta(job, include=kwargs)
+
+        # The job itself is updated right away; only the broadcast is batched.
+        # Worker threads have no running loop and hand the update over to the
+        # main loop instead.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if main_loop is not None:
+                main_loop.call_soon_threadsafe(queue_job_broadcast, job_id, update)
+        else:
+            queue_job_broadcast(job_id, update)
+
+    return job
 
-            jobs[job_id]["status"] = status
-            if progress is not None:
-                jobs[job_id]["progress"] = progress
-            if error:
-                jobs[job_id]["error"] = error
-            if finished_at:
-                jobs[job_id]["finished_at"] = finished_at
-            if current_activity:
-                jobs[job_id]["current_activity"] = current_activity
 
-            # Update any additional fields
-            for key, value in kwargs.items():
-                jobs[job_id][key] = value
+# Maximum number of progress messages buffered per job before the oldest are dropped
+PROGRESS_QUEUE_SIZE = 64
 
-            # Create a background task to broadcast the update
-            # This ensures the update is sent even during long-running operations
-            asyncio.create_task(run_broadcast(job_id, jobs[job_id]))
 
-            # Log the task creation
-            logger.info(f"Created background task to broadcast update for job {job_id}")
+# Relay progress messages from the processing pipeline into job status updates
+class JobProgress:
+    """Collect progress messages for a job and apply them to its status.
 
-        return jobs[job_id]
-    return None
+    ``report`` may be called from any thread; messages are handed to the event
+    loop and applied by a single consumer task, which only keeps the newest of
+    any messages that queued up while it was busy. At most
+    PROGRESS_QUEUE_SIZE messages are held, dropping the oldest first.
+    """
 
+    _STOP = object()
 
-# Redirect stdout to capture progress messages
-class ProgressCapture:
     def __init__(self, job_id):
         self.job_id = job_id
-        self.old_stdout = sys.stdout
-        self.captured = StringIO()
-        self.last_update_time = time.time()
-        self.update_interval = 0.3  # Send updates more frequently (was 0.5s)
-        self.batched_messages = []
+        self.queue = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
         self.last_progress = 0  # Track the last reported progress value
+        self._loop = None
+        self._consumer = None
 
-    def __enter__(self):
-        sys.stdout = self
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._consumer = asyncio.create_task(self._consume())
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout = self.old_stdout
-        # Flush any remaining messages
-        self._send_batched_updates()
-
-    def write(self, text):
-        self.old_stdout.write(text)
-        self.captured.write(text)
-
-        # Check for progress update patterns
-        if "PROGRESS_UPDATE:" in text:
-            # Extract the message after the marker
-            message = text.split("PROGRESS_UPDATE:", 1)[1].strip()
-            # Batch the message for update
-            self.batched_messages.append(message)
-            self._maybe_send_update()
-
-        elif "ERROR:" in text:
-            # Extract error message
-            error_msg = text.split("ERROR:", 1)[1].strip()
-            # Update job with error information but don't change status
-            if self.job_id in jobs:
-                update_job_status(
-                    self.job_id, jobs[self.job_id]["status"], error=error_msg
-                )
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Apply any messages still queued before returning
+        self._loop.call_soon_threadsafe(self._put, self._STOP)
+        await self._consumer
 
-    def _maybe_send_update(self):
-        """Send updates at most every update_interval seconds"""
-        current_time = time.time()
-        if current_time - self.last_update_time >= self.update_interval:
-            self._send_batched_updates()
+    def report(self, message, stage=None):
+        """Progress callback handed to the video_voiceover functions."""
+        self._loop.call_soon_threadsafe(self._put, (message, stage))
 
-    def _send_batched_updates(self):
-        """Send all batched messages as a single update"""
-        if not self.batched_messages or self.job_id not in jobs:
+    def _put(self, item):
+        # Only the newest message is applied, so older ones are safe to drop
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+    async def _consume(self):
+        while True:
+            messages = [await self.queue.get()]
+            while not self.queue.empty():
+                messages.append(self.queue.get_nowait())
+
+            # The stop marker is always the last message queued
+            stop = messages[-1] is self._STOP
+            if stop:
+                messages.pop()
+            if messages:
+                try:
+                    self._apply(*messages[-1])
+                except Exception as e:
+                    logger.error(
+                        f"[Job {self.job_id}] Error applying progress update: {str(e)}"
+                    )
+            if stop:
+                return
+
+    def _apply(self, message, stage):
+        """Update the job with the latest progress message"""
+        if self.job_id not in jobs:
             return
 
-        # Use the most recent message as the current activity
-        most_recent = self.batched_messages[-1]
-
-        # More fine-grained progress indicators - expanded for better granularity
-        progress_indicators = {
-            # Audio extraction phase - 0-15%
-            "audio extraction": 10,
-            "extracting audio": 5,
-            "extracted audio": 15,
-            # Transcription phase - 15-40%
-            "loading whisper": 18,
-            "whisper model loaded": 20,
-            "beginning transcription": 25,
-            "transcribing": 30,
-            "transcription completed": 40,
-            # TTS generation phase - 40-80%
-            "generating tts": 45,
-            "tts generating segment": 55,
-            "voiceover assembly": 70,
-            "voiceover assembly completed": 80,
-            # Final video creation - 80-100%
-            "creating final video": 85,
-            "encoding final video": 95,
-            "completed successfully": 100,
-        }
-
-        # Default to incrementing progress slightly if we can't match a specific indicator
-        progress = None
+        # Late messages must not overwrite the final state of a finished job
         current_status = jobs[self.job_id]["status"]
+        if current_status in ["completed", "error"]:
+            return
 
-        # Determine progress
-        for indicator, value in progress_indicators.items():
-            if indicator.lower() in most_recent.lower():
-                progress = value
-                break
+        # Milestone messages map straight to a progress value
+        progress = STAGE_PROGRESS.get(stage)
 
         # If no specific progress found, increment slightly based on status
         if progress is None:
-            status_progress_map = {
-                "extracting_audio": 8,
-                "transcribing": 25,
-                "transcription_complete": 40,
-                "transcription_confirmed": 45,
-                "generating_tts": 60,
-                "creating_voiceover": 75,
-                "creating_video": 90,
-                "adjusting_speed": 85,
-                "creating_adjusted_video": 95,
-            }
-
             # If we're in a known status, use its default progress value
             # but only if it's higher than the last known progress
-            if current_status in status_progress_map:
-                default_progress = status_progress_map[current_status]
+            if current_status in STATUS_PROGRESS:
+                default_progress = STATUS_PROGRESS[current_status]
                 if default_progress > self.last_progress:
                     progress = default_progress
 
@@ -332,18 +756,11 @@ class ProgressCapture:
         # Update the job status with the latest message
         update_job_status(
             self.job_id,
-            jobs[self.job_id]["status"],
+            current_status,
             progress=progress,
-            current_activity=most_recent,
+            current_activity=message,
         )
 
-        # Reset for next batch
-        self.last_update_time = time.time()
-        self.batched_messages = []
-
-    def flush(self):
-        self.old_stdout.flush()
-
 
 # Background processing function
 async def process_video(
@@ -355,8 +772,8 @@ async def process_video(
     burn_subtitles: bool = True,
 ):
     """Process the uploaded video in the background."""
-    # Set up progress capture
-    with ProgressCapture(job_id) as progress_capture:
+    # Relay progress messages from the pipeline into the job status
+    async with JobProgress(job_id) as progress:
         try:
             # Update job status
             logger.info(f"[Job {job_id}] Starting processing: extracting audio")
@@ -368,41 +785,31 @@ async def process_video(
                 current_activity="Starting audio extraction from video",
             )
 
-            # Allow other tasks (like WebSocket broadcasts) to run
-            await asyncio.sleep(0.1)
-
-            # Step 1: Extract audio from video
-            audio_path = os.path.join(TEMP_DIR, f"{job_id}_audio.wav")
-            extract_audio_from_video(video_path, audio_path)
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
-            # Update job status
-            logger.info(f"[Job {job_id}] Audio extracted, now transcribing")
+            # Steps 1-2: Extract the audio and transcribe it to get segments.
+            # Whisper starts on the first chunks while the rest is still being
+            # decoded, so both steps run at once.
+            logger.info(f"[Job {job_id}] Extracting and transcribing audio")
             update_job_status(
                 job_id,
                 "transcribing",
                 progress=20,
-                audio_path=audio_path,
-                current_activity="Transcribing audio with Whisper AI",
+                current_activity="Extracting and transcribing audio with Whisper AI",
+            )
+            segments = await run_media_task(
+                transcribe_video,
+                video_path,
+                model_size="base",
+                progress_callback=progress.report,
             )
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
-            # Step 2: Transcribe audio to get segments
-            segments = transcribe_audio(audio_path, model_size="base")
 
             if not segments:
                 raise Exception("No speech detected in the video")
 
             # Save SRT file
             srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
-            save_srt_file(segments, srt_path)
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
+            await run_media_task(
+                save_srt_file, segments, srt_path, progress_callback=progress.report
+            )
 
             # Update job status with transcription segments
             logger.info(f"[Job {job_id}] Transcription complete, waiting for review")
@@ -416,213 +823,136 @@ async def process_video(
             )
 
             # At this point, we need to exit the function and wait for the user to confirm
-            # the transcription by calling the update_job_transcription endpoint
+            # the transcription by calling the update_job_transcription endpoint,
+            # which resumes the job in continue_video_processing
             logger.info(
                 f"[Job {job_id}] Process paused waiting for user transcription review"
             )
-            return
-
-            # The following code will only execute when the update_job_transcription
-            # endpoint is called and the job status is updated to "transcription_confirmed"
-            # This part is handled separately in the update_job_transcription endpoint
 
-            # Step 3: Generate TTS for each segment
-            os.environ["ELEVENLABS_API_KEY"] = elevenlabs_api_key
-
-            # Ensure ElevenLabs SDK uses the new key
-            try:
-                set_api_key(elevenlabs_api_key)
-            except Exception:
-                pass
-
-            # Log a masked version of the API key for debugging
-            masked_key = (
-                elevenlabs_api_key[:4]
-                + "*" * (len(elevenlabs_api_key) - 8)
-                + elevenlabs_api_key[-4:]
-                if len(elevenlabs_api_key) > 8
-                else "***"
-            )
-            logger.info(f"[Job {job_id}] Using ElevenLabs API Key: {masked_key}")
-            logger.info(
-                f"[Job {job_id}] Generating TTS with ElevenLabs (speed factor: {speed_factor})"
-            )
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {str(e)}")
             update_job_status(
                 job_id,
-                "generating_tts",
-                progress=50,
-                current_activity=f"Generating AI voiceover with speed factor {speed_factor}",
-            )
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
-            tts_clips_info = generate_tts_for_segments(
-                segments, voice_id, VOICE_SETTINGS, TEMP_DIR, speed_factor
+                "error",
+                progress=0,
+                error=str(e),
+                finished_at=datetime.now().isoformat(),
+                current_activity=f"Error: {str(e)}",
             )
 
-            if not tts_clips_info:
-                raise Exception("Failed to generate TTS audio")
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
+def is_valid_elevenlabs_api_key(api_key):
+    """Basic validation for ElevenLabs API key format."""
+    return bool(api_key) and API_KEY_RE.fullmatch(api_key) is not None
 
-            # Step 4: Create composite voiceover track
-            logger.info(f"[Job {job_id}] Creating composite voiceover track")
-            update_job_status(
-                job_id,
-                "creating_voiceover",
-                progress=80,
-                current_activity="Assembling audio segments into complete voiceover",
-            )
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
+def copy_file_in_kernel(src_fd: int, dst_path: str):
+    """Copy the contents of an open file to dst_path without reading it into Python."""
+    size = os.fstat(src_fd).st_size
+    with open(dst_path, "wb") as dst:
+        dst_fd = dst.fileno()
+        if HAS_FADVISE:
+            os.posix_fadvise(dst_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
 
-            # Get video duration
-            from moviepy.editor import VideoFileClip
+        offset = 0
+        use_copy_file_range = True
+        while offset < size:
+            count = size - offset
+            try:
+                if use_copy_file_range:
+                    copied = os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+                else:
+                    copied = os.sendfile(dst_fd, src_fd, offset, count)
+            except OSError as e:
+                # Older kernels can't copy_file_range across filesystems (e.g. /tmp
+                # to the media volume), sendfile still avoids the user-space copy
+                if use_copy_file_range and e.errno in (
+                    errno.EXDEV,
+                    errno.ENOSYS,
+                    errno.EOPNOTSUPP,
+                    errno.EINVAL,
+                ):
+                    use_copy_file_range = False
+                    os.lseek(dst_fd, offset, os.SEEK_SET)
+                    continue
+                raise
+            if copied == 0:
+                break
+            offset += copied
 
-            video_clip = VideoFileClip(video_path)
-            video_duration = video_clip.duration
-            video_clip.close()
 
-            voiceover_track = create_composite_voiceover(tts_clips_info, video_duration)
+def drop_page_cache(path: str):
+    """Flush a file to disk and tell the kernel its cached pages can be dropped."""
+    if not HAS_FADVISE:
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # Only clean pages are dropped, so write the file back first
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError as e:
+        logger.warning(f"Could not drop page cache for {path}: {str(e)}")
+    finally:
+        os.close(fd)
 
-            # Ensure the voiceover track has an fps attribute for saving as MP3
-            if not hasattr(voiceover_track, "fps") or voiceover_track.fps is None:
-                logger.info("Setting default fps=44100 on voiceover track")
-                voiceover_track.fps = 44100
 
-            # Save audio-only file
-            audio_output_path = os.path.join(OUTPUT_DIR, f"{job_id}_audio_only.mp3")
-            voiceover_track.write_audiofile(
-                audio_output_path, codec="mp3", verbose=False, logger=None
-            )
+@functools.lru_cache(maxsize=1024)
+def mask_api_key(api_key):
+    """Return the API key with all but its first and last 4 characters hidden."""
+    if api_key and len(api_key) > 8:
+        return api_key[:4] + "*" * (len(api_key) - 8) + api_key[-4:]
+    return "***"
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
 
-            # Step 5: Create final video
-            logger.info(f"[Job {job_id}] Creating final video")
-            update_job_status(
-                job_id,
-                "creating_video",
-                progress=90,
-                current_activity="Creating final video with voiceover",
-            )
+@app.on_event("startup")
+async def remember_event_loop():
+    """Keep a reference to the serving event loop for use from worker threads."""
+    global main_loop
+    main_loop = asyncio.get_running_loop()
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
 
-            output_video_path = os.path.join(OUTPUT_DIR, f"{job_id}_output.mp4")
-            srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
+@app.on_event("startup")
+async def create_stage_slots():
+    """Create the semaphores that bound how many jobs run each pipeline stage."""
+    for stage, limit in STAGE_CONCURRENCY.items():
+        stage_slots[stage] = asyncio.Semaphore(max(1, limit))
 
-            # Debug logging
-            logger.info(
-                f"[Job {job_id}] Calling create_final_video with burn_subtitles={burn_subtitles}, srt_path={srt_path}, srt_exists={os.path.exists(srt_path)}"
-            )
 
-            create_final_video(
-                video_path, voiceover_track, output_video_path, burn_subtitles, srt_path
-            )
+def start_processing_task(coro) -> asyncio.Task:
+    """Run a pipeline coroutine in the background, keeping a reference to it."""
+    task = asyncio.create_task(coro)
+    processing_tasks.add(task)
+    task.add_done_callback(processing_tasks.discard)
+    return task
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
 
-            # Copy SRT file to outputs folder for easy access
-            srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
-            output_srt_path = os.path.join(OUTPUT_DIR, f"{job_id}_subtitles.srt")
-            if os.path.exists(srt_path):
-                try:
-                    shutil.copy2(srt_path, output_srt_path)
-                    logger.info(
-                        f"[Job {job_id}] Copied SRT file to outputs folder: {output_srt_path}"
-                    )
-                except Exception as e:
-                    logger.error(f"[Job {job_id}] Error copying SRT file: {str(e)}")
+@app.on_event("startup")
+async def start_job_store_maintenance():
+    """Recover persisted jobs and start writing changed jobs back periodically."""
+    global job_store_task
+    failed = await asyncio.to_thread(jobs.fail_interrupted)
+    if failed:
+        logger.warning(f"Marked {failed} interrupted job(s) as failed")
+    job_store_task = asyncio.create_task(maintain_job_store())
 
-            # Clean up temporary files
-            try:
-                logger.info(f"[Job {job_id}] Cleaning up temporary files")
 
-                # Clean temporary segment files
-                segment_files = [
-                    f
-                    for f in os.listdir(TEMP_DIR)
-                    if f.startswith(f"segment_") and f.endswith(".mp3")
-                ]
-                for file in segment_files:
-                    try:
-                        os.remove(os.path.join(TEMP_DIR, file))
-                    except Exception as e:
-                        logger.error(
-                            f"[Job {job_id}] Error removing temp file {file}: {str(e)}"
-                        )
+@app.on_event("shutdown")
+async def stop_job_store_maintenance():
+    """Stop the maintenance task and write back any pending job changes."""
+    if job_store_task is not None:
+        job_store_task.cancel()
+    await asyncio.to_thread(jobs.write, jobs.collect_dirty())
 
-                # Clean temporary job files in temp directory
-                temp_job_files = [
-                    f for f in os.listdir(TEMP_DIR) if f.startswith(f"{job_id}_")
-                ]
-                for file in temp_job_files:
-                    try:
-                        os.remove(os.path.join(TEMP_DIR, file))
-                    except Exception as e:
-                        logger.error(
-                            f"[Job {job_id}] Error removing temp file {file}: {str(e)}"
-                        )
-
-                # Clean uploaded video in uploads directory
-                if os.path.exists(video_path):
-                    try:
-                        os.remove(video_path)
-                        logger.info(
-                            f"[Job {job_id}] Removed original upload file: {video_path}"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"[Job {job_id}] Error removing upload file: {str(e)}"
-                        )
-
-            except Exception as e:
-                logger.error(f"[Job {job_id}] Error during cleanup: {str(e)}")
-
-            # Mark job as completed
-            logger.info(f"[Job {job_id}] Processing completed successfully")
-            update_job_status(
-                job_id,
-                "completed",
-                progress=100,
-                finished_at=datetime.now().isoformat(),
-                video_path=f"/media/outputs/{job_id}_output.mp4",
-                audio_path=f"/media/outputs/{job_id}_audio_only.mp3",
-                srt_path=f"/media/outputs/{job_id}_subtitles.srt",
-                speed_factor=speed_factor,
-                current_activity="Processing completed successfully",
-            )
 
+async def maintain_job_store():
+    """Write changed jobs back to SQLite and evict idle ones from memory."""
+    while True:
+        await asyncio.sleep(JOB_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(jobs.write, jobs.collect_dirty())
+            jobs.evict_idle()
         except Exception as e:
-            logger.error(f"Error processing job {job_id}: {str(e)}")
-            update_job_status(
-                job_id,
-                "error",
-                progress=0,
-                error=str(e),
-                finished_at=datetime.now().isoformat(),
-                current_activity=f"Error: {str(e)}",
-            )
-
-
-def is_valid_elevenlabs_api_key(api_key):
-    """Basic validation for ElevenLabs API key format."""
-    # ElevenLabs API keys are typically 32 character strings
-    if not api_key or len(api_key) < 32:
-        return False
-
-    # Most API keys start with a specific prefix (could be updated based on actual format)
-    # if not api_key.startswith("el_"):
-    #    return False
-
-    return True
+            logger.error(f"Error maintaining job store: {str(e)}")
 
 
 # Endpoints
@@ -640,13 +970,26 @@ async def health_check():
 @app.websocket("/ws/{job_id}")
 async def websocket_endpoint(websocket: WebSocket, job_id: str):
     logger.info(f"New WebSocket connection request for job {job_id}")
+    if len(active_connections.get(job_id, [])) >= MAX_CONNECTIONS_PER_JOB:
+        logger.warning(
+            f"Rejecting WebSocket connection for job {job_id}: {MAX_CONNECTIONS_PER_JOB} clients already connected"
+        )
+        await websocket.close(code=1013)
+        return
+
     await websocket.accept()
     logger.info(f"WebSocket connection accepted for job {job_id}")
 
+    # All sends to this client go through its queue and a single writer task,
+    # so a slow client never holds up broadcasts to the others
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    connection = (websocket, queue)
+    writer_task = asyncio.create_task(client_writer(websocket, queue, job_id))
+
     # Add the connection to the list for this job
     if job_id not in active_connections:
         active_connections[job_id] = []
-    active_connections[job_id].append(websocket)
+    active_connections[job_id].append(connection)
     logger.info(
         f"Added WebSocket connection to active_connections for job {job_id}, total connections: {len(active_connections[job_id])}"
     )
@@ -656,52 +999,38 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
 
     try:
         # Send current job status if available
-        if job_id in jobs:
+        job = jobs.get(job_id)
+        if job is not None:
             logger.info(
-                f"Sending initial job status: {jobs[job_id].get('status')} for job {job_id}"
+                f"Sending initial job status: {job.get('status')} for job {job_id}"
             )
 
             # Ensure a valid current_activity is set
-            if not jobs[job_id].get("current_activity"):
-                status = jobs[job_id].get("status")
+            if not job.get("current_activity"):
+                status = job.get("status")
                 if status in statusMessages:
-                    jobs[job_id]["current_activity"] = statusMessages[status]
+                    job["current_activity"] = statusMessages[status]
                 else:
-                    jobs[job_id]["current_activity"] = f"Processing in {status} stage"
-
-            # Send the complete job state
-            await websocket.send_json(jobs[job_id])
-
-            # Force a progress update event for any job in progress
-            current_status = jobs[job_id].get("status")
-            if current_status not in ["completed", "error"]:
-                logger.info(
-                    f"Job {job_id} is in progress, sending immediate status update"
-                )
-                # Minor update to progress to trigger frontend refresh
-                if "progress" in jobs[job_id]:
-                    # Small increment to trigger UI update but not disrupt existing progress
-                    progress_increment = min(
-                        1.0, (100 - jobs[job_id]["progress"]) * 0.05
-                    )
-                    jobs[job_id]["progress"] += progress_increment
+                    job["current_activity"] = f"Processing in {status} stage"
 
-                # Send updated job state
-                await websocket.send_json(jobs[job_id])
+            # Send the complete job state once; afterwards the client asks for a
+            # resync itself when a ping reports a newer revision than it holds
+            enqueue_client_message(queue, encode_message(public_job(job)), job_id)
         else:
             logger.warning(f"No job record found for job_id {job_id}")
 
         # Start ping task to keep connection alive
-        ping_task = asyncio.create_task(keep_connection_alive(websocket, job_id))
+        ping_task = asyncio.create_task(keep_connection_alive(queue, job_id))
 
         # Keep the connection open and handle incoming messages
         while True:
             data = await websocket.receive_text()
             logger.info(f"Received WebSocket message for job {job_id}: {data[:100]}")
-            message = json.loads(data)
+            message = orjson.loads(data)
+            job = jobs.get(job_id)
 
             # Handle transcription update
-            if message.get("action") == "update_transcription" and job_id in jobs:
+            if message.get("action") == "update_transcription" and job is not None:
                 logger.info(f"Received transcription update for job {job_id}")
                 updated_transcription = message.get("transcription")
                 speed_factor = message.get(
@@ -709,16 +1038,16 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
                 )  # Get speed factor with default 1.0
 
                 if updated_transcription:
-                    jobs[job_id]["transcription"] = updated_transcription
-                    jobs[job_id]["status"] = "transcription_confirmed"
-                    jobs[job_id]["progress"] = 45
-                    jobs[job_id][
-                        "current_activity"
-                    ] = "Transcription confirmed, proceeding with voiceover generation"
+                    job["transcription"] = updated_transcription
+                    job["status"] = "transcription_confirmed"
+                    job["progress"] = 45
+                    job["current_activity"] = (
+                        "Transcription confirmed, proceeding with voiceover generation"
+                    )
 
                     # Store the speed factor in the job
                     if speed_factor:
-                        jobs[job_id]["speed_factor"] = speed_factor
+                        job["speed_factor"] = speed_factor
                         logger.info(
                             f"Updated speed factor for job {job_id} to {speed_factor}"
                         )
@@ -726,13 +1055,23 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
                     logger.info(
                         f"Updated transcription for job {job_id}, broadcasting update"
                     )
-                    await broadcast_job_update(job_id, jobs[job_id])
+                    bump_revision(job_id)
+                    queue_job_broadcast(job_id, public_job(job))
+
+            # Client noticed its revision lags behind the pings, send the full state
+            elif message.get("action") == "resync" and job is not None:
+                logger.info(f"Resyncing full job state for job {job_id}")
+                enqueue_client_message(queue, encode_message(public_job(job)), job_id)
+
+            # Client wants the large, rarely changing part of the job
+            elif message.get("action") == "get_payload" and job is not None:
+                enqueue_client_message(queue, encode_message(job_payload(job)), job_id)
 
     except WebSocketDisconnect:
         # Remove the connection when it's closed
         logger.info(f"WebSocket disconnected for job {job_id}")
         if job_id in active_connections:
-            active_connections[job_id].remove(websocket)
+            active_connections[job_id].remove(connection)
             logger.info(
                 f"Removed WebSocket connection for job {job_id}, remaining connections: {len(active_connections[job_id])}"
             )
@@ -741,18 +1080,19 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
                 logger.info(f"Deleted empty connections list for job {job_id}")
     except Exception as e:
         logger.error(f"Error in WebSocket connection for job {job_id}: {str(e)}")
-        if job_id in active_connections and websocket in active_connections[job_id]:
-            active_connections[job_id].remove(websocket)
+        if job_id in active_connections and connection in active_connections[job_id]:
+            active_connections[job_id].remove(connection)
             if not active_connections[job_id]:
                 del active_connections[job_id]
     finally:
         # Cancel ping task if it exists
         if ping_task:
             ping_task.cancel()
+        writer_task.cancel()
 
 
 # Websocket keep-alive ping function
-async def keep_connection_alive(websocket: WebSocket, job_id: str):
+async def keep_connection_alive(queue: asyncio.Queue, job_id: str):
     """Send periodic pings to keep WebSocket connection alive"""
     ping_interval = 3  # seconds (reduced from 5s for more frequent pings in Docker)
     try:
@@ -760,35 +1100,40 @@ async def keep_connection_alive(websocket: WebSocket, job_id: str):
             await asyncio.sleep(ping_interval)
             try:
                 # If job exists, send current status as a heartbeat
-                if job_id in jobs:
+                job = jobs.get(job_id)
+                if job is not None:
                     logger.debug(f"Sending heartbeat ping for job {job_id}")
 
                     # Get current job status
-                    current_status = jobs[job_id].get("status")
-                    current_progress = jobs[job_id].get("progress", 0)
-                    current_activity = jobs[job_id].get("current_activity", "")
-
-                    # Send a more detailed ping with current job state
-                    await websocket.send_json(
-                        {
-                            "type": "ping",
-                            "job_id": job_id,
-                            "status": current_status,
-                            "progress": current_progress,
-                            "current_activity": current_activity,
-                            "timestamp": datetime.now().isoformat(),
-                        }
+                    current_status = job.get("status")
+                    current_progress = job.get("progress", 0)
+                    current_activity = job.get("current_activity", "")
+
+                    # Send a small ping with the current job state; clients
+                    # request a full resync when its revision is newer than theirs
+                    enqueue_client_message(
+                        queue,
+                        encode_message(
+                            {
+                                "type": "ping",
+                                "job_id": job_id,
+                                "status": current_status,
+                                "progress": current_progress,
+                                "current_activity": current_activity,
+                                "rev": job.get("_rev", 0),
+                                "timestamp": datetime.now().isoformat(),
+                            }
+                        ),
+                        job_id,
                     )
-
-                    # For jobs in progress, always send the full job state
-                    # This helps ensure frontend stays in sync
-                    if current_status not in ["completed", "error"]:
-                        logger.debug(f"Sending full state update for job {job_id}")
-                        await websocket.send_json(jobs[job_id])
                 else:
                     # Simple ping if no job data
-                    await websocket.send_json(
-                        {"type": "ping", "timestamp": datetime.now().isoformat()}
+                    enqueue_client_message(
+                        queue,
+                        encode_message(
+                            {"type": "ping", "timestamp": datetime.now().isoformat()}
+                        ),
+                        job_id,
                     )
             except Exception as e:
                 logger.error(
@@ -827,11 +1172,7 @@ async def upload_video(
         )
 
     # Log a masked version of the API key for debugging
-    masked_key = (
-        api_key[:4] + "*" * (len(api_key) - 8) + api_key[-4:]
-        if len(api_key) > 8
-        else "***"
-    )
+    masked_key = mask_api_key(api_key)
     logger.info(
         f"Upload video with ElevenLabs API Key: {masked_key}, speed factor: {speed_factor}, burn subtitles: {burn_subtitles}"
     )
@@ -858,8 +1199,22 @@ async def upload_video(
     try:
         # Save uploaded file to disk
         file_location = os.path.join(UPLOAD_DIR, f"{job_id}_{file.filename}")
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        if HAS_COPY_FILE_RANGE and getattr(file.file, "_rolled", False):
+            # Large uploads are already spooled to a temporary file, copy it
+            # inside the kernel instead of through Python
+            await asyncio.to_thread(
+                copy_file_in_kernel, file.file.fileno(), file_location
+            )
+        else:
+            # Stream the upload to disk without blocking the event loop
+            async with aiofiles.open(file_location, "wb") as buffer:
+                if HAS_FADVISE:
+                    os.posix_fadvise(buffer.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await buffer.write(chunk)
+
+        # The upload is read once more by ffmpeg, keep it out of the page cache
+        await asyncio.to_thread(drop_page_cache, file_location)
 
         # Check file size after saving
         file_size = os.path.getsize(file_location)
@@ -891,11 +1246,12 @@ async def upload_video(
         "burn_subtitles": burn_subtitles,
         "current_activity": "File uploaded, waiting to start processing",
         "_elevenlabs_api_key": api_key,  # Store API key for later use (secure in production)
+        "_upload_path": file_location,  # Saves scanning the uploads directory later
     }
     jobs[job_id] = job
 
     # Broadcast the initial job status
-    asyncio.create_task(run_broadcast(job_id, job))
+    queue_job_broadcast(job_id, public_job(job))
 
     # Start background processing
     background_tasks.add_task(
@@ -913,18 +1269,28 @@ async def upload_video(
     return {"job_id": job_id, "status": "Processing started"}
 
 
-@app.get("/jobs")
+@app.get("/jobs", response_class=ORJSONResponse)
 async def get_all_jobs():
     """Return all jobs."""
-    return jobs
+    # Returning the response directly skips FastAPI's jsonable_encoder pass
+    all_jobs = await asyncio.to_thread(jobs.all)
+    return ORJSONResponse({job_id: public_job(job) for job_id, job in all_jobs.items()})
 
 
-@app.get("/jobs/{job_id}")
+@app.get("/jobs/{job_id}", response_class=ORJSONResponse)
 async def get_job(job_id: str):
     """Return details for a specific job."""
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="Job not found")
-    return jobs[job_id]
+    return ORJSONResponse(public_job(jobs[job_id]))
+
+
+@app.get("/jobs/{job_id}/payload", response_class=ORJSONResponse)
+async def get_job_payload(job_id: str):
+    """Return the large, rarely changing fields of a job, such as its transcription."""
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ORJSONResponse(job_payload(jobs[job_id]))
 
 
 @app.post("/jobs/{job_id}/update-transcription")
@@ -933,23 +1299,27 @@ async def update_job_transcription(job_id: str, transcription: List[Dict[str, An
     if job_id not in jobs:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    if jobs[job_id]["status"] != "transcription_complete":
-        raise HTTPException(status_code=400, detail="Job not in transcription phase")
+    # Hold the shard lock so two confirmations can't both resume processing
+    async with jobs.lock(job_id):
+        if jobs[job_id]["status"] != "transcription_complete":
+            raise HTTPException(
+                status_code=400, detail="Job not in transcription phase"
+            )
 
-    # Update transcription
-    jobs[job_id]["transcription"] = transcription
+        # Update transcription
+        jobs[job_id]["transcription"] = transcription
 
-    # Update SRT file
-    srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
-    save_srt_file(transcription, srt_path)
+        # Update SRT file
+        srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
+        await asyncio.to_thread(save_srt_file, transcription, srt_path)
 
-    # Update job status to indicate transcription is confirmed
-    update_job_status(
-        job_id,
-        "transcription_confirmed",
-        progress=45,
-        current_activity="Transcription confirmed, proceeding with voiceover generation",
-    )
+        # Update job status to indicate transcription is confirmed
+        update_job_status(
+            job_id,
+            "transcription_confirmed",
+            progress=45,
+            current_activity="Transcription confirmed, proceeding with voiceover generation",
+        )
 
     # Get the necessary job data to resume processing
     job_data = jobs[job_id]
@@ -957,14 +1327,9 @@ async def update_job_transcription(job_id: str, transcription: List[Dict[str, An
     speed_factor = job_data.get("speed_factor", 1.0)
     burn_subtitles = job_data.get("burn_subtitles", True)
 
-    # Get the video path
-    video_path = None
-    for file in os.listdir(UPLOAD_DIR):
-        if file.startswith(job_id + "_"):
-            video_path = os.path.join(UPLOAD_DIR, file)
-            break
-
-    if not video_path:
+    # Get the video path recorded at upload
+    video_path = job_data.get("_upload_path")
+    if not video_path or not os.path.exists(video_path):
         raise HTTPException(
             status_code=404, detail="Original video file not found for this job"
         )
@@ -975,7 +1340,7 @@ async def update_job_transcription(job_id: str, transcription: List[Dict[str, An
         raise HTTPException(status_code=500, detail="API key not available")
 
     # Start the continuation of video processing in the background
-    asyncio.create_task(
+    start_processing_task(
         continue_video_processing(
             job_id,
             video_path,
@@ -990,6 +1355,98 @@ async def update_job_transcription(job_id: str, transcription: List[Dict[str, An
     return {"status": "Transcription updated, processing resumed"}
 
 
+async def run_media_task(func, *args, **kwargs):
+    """Run a blocking media processing function on the media worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        MEDIA_EXECUTOR, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_ffmpeg(*args: str, input_data: Optional[memoryview] = None):
+    """Run ffmpeg with the given arguments, raising an exception if it fails.
+
+    If input_data is given it is streamed to ffmpeg's stdin.
+    """
+    process = await asyncio.create_subprocess_exec(
+        FFMPEG_BINARY,
+        "-y",
+        "-v",
+        "error",
+        *args,
+        stdin=(
+            asyncio.subprocess.DEVNULL
+            if input_data is None
+            else asyncio.subprocess.PIPE
+        ),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    if input_data is None:
+        _, stderr = await process.communicate()
+    else:
+        # Feed stdin in chunks while collecting stderr, so neither pipe fills up
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            for offset in range(0, len(input_data), FFMPEG_PIPE_CHUNK_SIZE):
+                process.stdin.write(
+                    input_data[offset : offset + FFMPEG_PIPE_CHUNK_SIZE]
+                )
+                await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg stopped reading; its exit code and stderr say why
+            pass
+        stderr = await stderr_task
+        await process.wait()
+    if process.returncode != 0:
+        raise Exception(
+            f"ffmpeg exited with code {process.returncode}: {stderr.decode(errors='replace').strip()}"
+        )
+
+
+async def mux_voiceover(video_path: str, audio_path: str, output_video_path: str):
+    """Replace a video's audio track, copying the video stream as is."""
+    await run_ffmpeg(
+        "-i", video_path, "-i", audio_path, *copy_mux_args(0, 1, output_video_path)
+    )
+
+
+async def encode_voiceover(
+    pcm,
+    audio_output_path: str,
+    video_path: Optional[str] = None,
+    output_video_path: Optional[str] = None,
+):
+    """Encode a PCM voiceover to MP3, and optionally mux it into a video.
+
+    Both outputs come from one ffmpeg run fed the raw samples over stdin, so the
+    voiceover is never written to disk and read back in between.
+    """
+    args = [
+        "-f",
+        "f32le",
+        "-ar",
+        str(VOICEOVER_SAMPLE_RATE),
+        "-ac",
+        str(VOICEOVER_CHANNELS),
+        "-i",
+        "pipe:0",
+    ]
+    if video_path:
+        args += ["-i", video_path, *copy_mux_args(1, 0, output_video_path)]
+    args += [
+        "-map",
+        "0:a:0",
+        "-c:a",
+        "libmp3lame",
+        "-b:a",
+        "192k",
+        audio_output_path,
+    ]
+    await run_ffmpeg(*args, input_data=memoryview(pcm).cast("B"))
+
+
 async def continue_video_processing(
     job_id: str,
     video_path: str,
@@ -1000,26 +1457,14 @@ async def continue_video_processing(
     burn_subtitles: bool = True,
 ):
     """Continue processing the video after transcription has been confirmed."""
-    # Set up progress capture
-    with ProgressCapture(job_id) as progress_capture:
+    # Relay progress messages from the pipeline into the job status
+    async with JobProgress(job_id) as progress:
         try:
-            # Step 3: Generate TTS for each segment
-            os.environ["ELEVENLABS_API_KEY"] = elevenlabs_api_key
-
-            # Ensure ElevenLabs SDK uses the new key
-            try:
-                set_api_key(elevenlabs_api_key)
-            except Exception:
-                pass
+            # Step 3: Generate TTS for each segment, with this job's own key
+            # passed down to the requests rather than set process-wide
 
             # Log a masked version of the API key for debugging
-            masked_key = (
-                elevenlabs_api_key[:4]
-                + "*" * (len(elevenlabs_api_key) - 8)
-                + elevenlabs_api_key[-4:]
-                if len(elevenlabs_api_key) > 8
-                else "***"
-            )
+            masked_key = mask_api_key(elevenlabs_api_key)
             logger.info(f"[Job {job_id}] Using ElevenLabs API Key: {masked_key}")
             logger.info(
                 f"[Job {job_id}] Generating TTS with ElevenLabs (speed factor: {speed_factor})"
@@ -1031,22 +1476,37 @@ async def continue_video_processing(
                 current_activity=f"Generating AI voiceover with speed factor {speed_factor}",
             )
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
             # Use the updated transcription
             segments = transcription
 
-            tts_clips_info = generate_tts_for_segments(
-                segments, voice_id, VOICE_SETTINGS, TEMP_DIR, speed_factor
+            # Read the video duration while the voiceover is being generated
+            duration_task = asyncio.create_task(
+                asyncio.to_thread(probe_duration, video_path)
             )
+            try:
+                async with stage_slots["tts"]:
+                    tts_clips_info = await run_media_task(
+                        generate_tts_for_segments,
+                        segments,
+                        voice_id,
+                        VOICE_SETTINGS,
+                        speed_factor,
+                        progress_callback=progress.report,
+                        cache_dir=TTS_CACHE_DIR,
+                        api_key=elevenlabs_api_key,
+                    )
+            except BaseException:
+                # The probe runs in a thread and can't be cancelled, so wait for
+                # it and discard its result or error
+                with contextlib.suppress(Exception):
+                    await duration_task
+                raise
 
             if not tts_clips_info:
+                with contextlib.suppress(Exception):
+                    await duration_task
                 raise Exception("Failed to generate TTS audio")
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
             # Step 4: Create composite voiceover track
             logger.info(f"[Job {job_id}] Creating composite voiceover track")
             update_job_status(
@@ -1056,31 +1516,15 @@ async def continue_video_processing(
                 current_activity="Assembling audio segments into complete voiceover",
             )
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
-            # Get video duration
-            from moviepy.editor import VideoFileClip
-
-            video_clip = VideoFileClip(video_path)
-            video_duration = video_clip.duration
-            video_clip.close()
+            video_duration = await duration_task
 
-            voiceover_track = create_composite_voiceover(tts_clips_info, video_duration)
-
-            # Ensure the voiceover track has an fps attribute for saving as MP3
-            if not hasattr(voiceover_track, "fps") or voiceover_track.fps is None:
-                logger.info("Setting default fps=44100 on voiceover track")
-                voiceover_track.fps = 44100
-
-            # Save audio-only file
-            audio_output_path = os.path.join(OUTPUT_DIR, f"{job_id}_audio_only.mp3")
-            voiceover_track.write_audiofile(
-                audio_output_path, codec="mp3", verbose=False, logger=None
-            )
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
+            async with stage_slots["compose"]:
+                voiceover_pcm = await run_media_task(
+                    mix_voiceover,
+                    tts_clips_info,
+                    video_duration,
+                    progress_callback=progress.report,
+                )
 
             # Step 5: Create final video
             logger.info(f"[Job {job_id}] Creating final video")
@@ -1091,17 +1535,55 @@ async def continue_video_processing(
                 current_activity="Creating final video with voiceover",
             )
 
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
-
+            audio_output_path = os.path.join(OUTPUT_DIR, f"{job_id}_audio_only.mp3")
             output_video_path = os.path.join(OUTPUT_DIR, f"{job_id}_output.mp4")
             srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
-            create_final_video(
-                video_path, voiceover_track, output_video_path, burn_subtitles, srt_path
-            )
-
-            # Allow other tasks to run
-            await asyncio.sleep(0.1)
+            async with stage_slots["mux"]:
+                if burn_subtitles and os.path.exists(srt_path):
+                    # Burned-in subtitles change the frames, so the video is re-encoded
+                    await encode_voiceover(voiceover_pcm, audio_output_path)
+                    await run_media_task(
+                        create_final_video,
+                        video_path,
+                        AudioArrayClip(voiceover_pcm, fps=VOICEOVER_SAMPLE_RATE),
+                        output_video_path,
+                        burn_subtitles,
+                        srt_path,
+                        progress_callback=progress.report,
+                    )
+                else:
+                    # The frames are unchanged, only the audio track is replaced
+                    progress.report(
+                        "Muxing voiceover into the original video",
+                        stage="encoding_video",
+                    )
+                    try:
+                        await encode_voiceover(
+                            voiceover_pcm,
+                            audio_output_path,
+                            video_path,
+                            output_video_path,
+                        )
+                        progress.report(
+                            "Final video creation completed successfully!",
+                            stage="video_completed",
+                        )
+                    except Exception as e:
+                        # e.g. the source codec can't be stored in an MP4, so
+                        # let moviepy re-encode the video instead
+                        logger.warning(
+                            f"[Job {job_id}] Copying the video stream failed, re-encoding: {str(e)}"
+                        )
+                        await encode_voiceover(voiceover_pcm, audio_output_path)
+                        await run_media_task(
+                            create_final_video,
+                            video_path,
+                            AudioArrayClip(voiceover_pcm, fps=VOICEOVER_SAMPLE_RATE),
+                            output_video_path,
+                            False,
+                            progress_callback=progress.report,
+                            copy_video=False,
+                        )
 
             # Copy SRT file to outputs folder for easy access
             srt_path = os.path.join(TEMP_DIR, f"{job_id}_subtitles.srt")
@@ -1119,30 +1601,13 @@ async def continue_video_processing(
             try:
                 logger.info(f"[Job {job_id}] Cleaning up temporary files")
 
-                # Clean temporary segment files
-                segment_files = [
-                    f
-                    for f in os.listdir(TEMP_DIR)
-                    if f.startswith(f"segment_") and f.endswith(".mp3")
-                ]
-                for file in segment_files:
-                    try:
-                        os.remove(os.path.join(TEMP_DIR, file))
-                    except Exception as e:
-                        logger.error(
-                            f"[Job {job_id}] Error removing temp file {file}: {str(e)}"
-                        )
-
                 # Clean temporary job files in temp directory
-                temp_job_files = [
-                    f for f in os.listdir(TEMP_DIR) if f.startswith(f"{job_id}_")
-                ]
-                for file in temp_job_files:
+                for file in Path(TEMP_DIR).glob(f"{job_id}_*"):
                     try:
-                        os.remove(os.path.join(TEMP_DIR, file))
+                        file.unlink()
                     except Exception as e:
                         logger.error(
-                            f"[Job {job_id}] Error removing temp file {file}: {str(e)}"
+                            f"[Job {job_id}] Error removing temp file {file.name}: {str(e)}"
                         )
 
                 # Clean uploaded video in uploads directory
@@ -1192,52 +1657,42 @@ async def get_voices(elevenlabs_api_key: str = Header(None, alias="xi-api-key"))
     try:
         # Validate API key
         if not is_valid_elevenlabs_api_key(elevenlabs_api_key):
-            masked_key = (
-                elevenlabs_api_key[:4]
-                + "*" * (len(elevenlabs_api_key) - 8)
-                + elevenlabs_api_key[-4:]
-                if len(elevenlabs_api_key) > 8
-                else "***"
-            )
+            masked_key = mask_api_key(elevenlabs_api_key)
             logger.error(f"Invalid API key format: {masked_key}")
             raise HTTPException(
                 status_code=400,
                 detail="Invalid ElevenLabs API key format. Please provide a valid API key.",
             )
 
-        # Temporarily set the API key in the environment
-        os.environ["ELEVENLABS_API_KEY"] = elevenlabs_api_key
-
-        # Ensure ElevenLabs SDK uses the new key
-        try:
-            set_api_key(elevenlabs_api_key)
-        except Exception:
-            pass
+        # Reuse a recent voice list for this key, dropping expired entries
+        now = time.monotonic()
+        for key_hash, (expires_at, _) in list(voices_cache.items()):
+            if expires_at <= now:
+                del voices_cache[key_hash]
+        key_hash = hashlib.sha256(elevenlabs_api_key.encode()).hexdigest()
+        cached = voices_cache.get(key_hash)
+        if cached is not None:
+            return cached[1]
 
         # Log a masked version of the API key for debugging
-        masked_key = (
-            elevenlabs_api_key[:4]
-            + "*" * (len(elevenlabs_api_key) - 8)
-            + elevenlabs_api_key[-4:]
-            if len(elevenlabs_api_key) > 8
-            else "***"
-        )
+        masked_key = mask_api_key(elevenlabs_api_key)
         logger.info(f"Fetching voices using ElevenLabs API Key: {masked_key}")
 
-        # This function returns the actual objects, but we need serializable data
-        all_voices = list_available_voices()
+        # Fetched with this request's own key, so the cached list is this account's
+        all_voices = await asyncio.to_thread(fetch_voices, elevenlabs_api_key)
 
-        # Convert to serializable format
+        # Keep only the fields the frontend uses
         voice_data = [
             {
-                "voice_id": voice.voice_id,
-                "name": voice.name,
-                "preview_url": voice.preview_url,
-                "description": voice.description,
-                "category": voice.category,
+                "voice_id": voice["voice_id"],
+                "name": voice.get("name"),
+                "preview_url": voice.get("preview_url"),
+                "description": voice.get("description"),
+                "category": voice.get("category"),
             }
             for voice in all_voices
         ]
+        voices_cache[key_hash] = (now + VOICES_CACHE_TTL, voice_data)
 
         return voice_data
     except Exception as e:
@@ -1267,14 +1722,9 @@ async def adjust_audio_speed(
     if not audio_path:
         raise HTTPException(status_code=404, detail="Audio file not found for this job")
 
-    # Get the path to the video
-    video_path = None
-    for file in os.listdir(UPLOAD_DIR):
-        if file.startswith(job_id + "_"):
-            video_path = os.path.join(UPLOAD_DIR, file)
-            break
-
-    if not video_path:
+    # Get the path to the video recorded at upload
+    video_path = jobs[job_id].get("_upload_path")
+    if not video_path or not os.path.exists(video_path):
         raise HTTPException(
             status_code=404, detail="Original video file not found for this job"
         )
@@ -1294,141 +1744,120 @@ async def adjust_audio_speed(
     return {"status": "Speed adjustment started", "job_id": job_id}
 
 
+def atempo_filter(speed_factor: float) -> str:
+    """Build an ffmpeg atempo filter chain for any positive speed factor."""
+    # A single atempo stage only accepts factors between 0.5 and 2.0
+    stages = []
+    while speed_factor > 2.0:
+        stages.append("atempo=2.0")
+        speed_factor /= 2.0
+    while speed_factor < 0.5:
+        stages.append("atempo=0.5")
+        speed_factor /= 0.5
+    stages.append(f"atempo={speed_factor}")
+    return ",".join(stages)
+
+
+async def render_speed_adjustment(
+    job_id: str, audio_path: str, speed_factor: float
+) -> str:
+    """Write the speed-adjusted audio file for a job and return its path."""
+    adjusted_audio_path = os.path.join(
+        OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_audio.mp3"
+    )
+    await run_ffmpeg(
+        "-i",
+        audio_path,
+        "-filter:a",
+        atempo_filter(speed_factor),
+        "-c:a",
+        "libmp3lame",
+        "-b:a",
+        "192k",
+        adjusted_audio_path,
+    )
+    return adjusted_audio_path
+
+
 async def process_speed_adjustment(
     job_id: str, audio_path: str, video_path: str, speed_factor: float
 ):
     """Process the speed adjustment in the background."""
-    # Set up progress capture
-    with ProgressCapture(job_id) as progress_capture:
-        try:
-            # Update job status
-            update_job_status(
-                job_id,
-                "adjusting_speed",
-                progress=10,
-                current_activity=f"Adjusting audio speed to {speed_factor*100}%",
-            )
-
-            logger.info(
-                f"[Job {job_id}] Adjusting audio speed with factor: {speed_factor}"
-            )
-
-            # Import here to avoid circular imports
-            from moviepy.editor import AudioFileClip, VideoFileClip
-
-            # Load the audio file
-            audio_clip = AudioFileClip(audio_path)
-
-            # Adjust the speed
-            from moviepy.audio.fx.all import speedx
-
-            adjusted_audio = audio_clip.fx(speedx, speed_factor)
-
-            # Save the adjusted audio
-            adjusted_audio_path = os.path.join(
-                OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_audio.mp3"
-            )
-            adjusted_audio.write_audiofile(
-                adjusted_audio_path, codec="mp3", verbose=False, logger=None
-            )
-
-            # Update progress
-            update_job_status(
-                job_id,
-                "creating_adjusted_video",
-                progress=50,
-                current_activity="Creating new video with adjusted audio speed",
-            )
+    try:
+        # Update job status
+        update_job_status(
+            job_id,
+            "adjusting_speed",
+            progress=10,
+            current_activity=f"Adjusting audio speed to {speed_factor*100}%",
+        )
 
-            # Create a new video with the adjusted audio
-            video_clip = VideoFileClip(video_path)
-            final_clip = video_clip.set_audio(adjusted_audio)
+        logger.info(f"[Job {job_id}] Adjusting audio speed with factor: {speed_factor}")
 
-            # Save the adjusted video
-            adjusted_video_path = os.path.join(
-                OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_video.mp4"
-            )
-            final_clip.write_videofile(
-                adjusted_video_path,
-                codec="libx264",
-                audio_codec="aac",
-                temp_audiofile=os.path.join(TEMP_DIR, f"{job_id}_temp_audio.m4a"),
-                remove_temp=True,
-                verbose=False,
-                logger=None,
-            )
-
-            # Close the clips to release resources
-            audio_clip.close()
-            adjusted_audio.close()
-            video_clip.close()
-            final_clip.close()
+        # Let ffmpeg's atempo filter retime the audio
+        adjusted_audio_path = await render_speed_adjustment(
+            job_id, audio_path, speed_factor
+        )
 
-            # Copy SRT file to outputs folder with speed adjustment info in the filename
-            # First check if there's an existing SRT in outputs from the original processing
-            original_srt_path = os.path.join(OUTPUT_DIR, f"{job_id}_subtitles.srt")
-            if os.path.exists(original_srt_path):
-                try:
-                    adjusted_srt_path = os.path.join(
-                        OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_subtitles.srt"
-                    )
-                    shutil.copy2(original_srt_path, adjusted_srt_path)
-                    logger.info(
-                        f"[Job {job_id}] Copied SRT file for speed adjusted version: {adjusted_srt_path}"
-                    )
+        # Update progress
+        update_job_status(
+            job_id,
+            "creating_adjusted_video",
+            progress=50,
+            current_activity="Creating new video with adjusted audio speed",
+        )
 
-                    # Update SRT path in job record
-                    jobs[job_id][
-                        "srt_path"
-                    ] = f"/media/outputs/{job_id}_speed_{speed_factor}_subtitles.srt"
-                except Exception as e:
-                    logger.error(
-                        f"[Job {job_id}] Error copying SRT file for speed adjustment: {str(e)}"
-                    )
+        # Put the adjusted audio on the video without re-encoding its frames
+        adjusted_video_path = os.path.join(
+            OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_video.mp4"
+        )
+        async with stage_slots["mux"]:
+            await mux_voiceover(video_path, adjusted_audio_path, adjusted_video_path)
 
-            # Clean up temporary files created during speed adjustment
+        # Copy SRT file to outputs folder with speed adjustment info in the filename
+        # First check if there's an existing SRT in outputs from the original processing
+        original_srt_path = os.path.join(OUTPUT_DIR, f"{job_id}_subtitles.srt")
+        if os.path.exists(original_srt_path):
             try:
+                adjusted_srt_path = os.path.join(
+                    OUTPUT_DIR, f"{job_id}_speed_{speed_factor}_subtitles.srt"
+                )
+                shutil.copy2(original_srt_path, adjusted_srt_path)
                 logger.info(
-                    f"[Job {job_id}] Cleaning up temporary files from speed adjustment"
+                    f"[Job {job_id}] Copied SRT file for speed adjusted version: {adjusted_srt_path}"
                 )
 
-                # Clean temporary files in temp directory related to this speed adjustment
-                temp_job_files = [
-                    f for f in os.listdir(TEMP_DIR) if job_id in f and "temp_audio" in f
-                ]
-                for file in temp_job_files:
-                    try:
-                        os.remove(os.path.join(TEMP_DIR, file))
-                    except Exception as e:
-                        logger.error(
-                            f"[Job {job_id}] Error removing temp file {file}: {str(e)}"
-                        )
-
+                # Update SRT path in job record
+                jobs[job_id][
+                    "srt_path"
+                ] = f"/media/outputs/{job_id}_speed_{speed_factor}_subtitles.srt"
             except Exception as e:
-                logger.error(f"[Job {job_id}] Error during cleanup: {str(e)}")
+                logger.error(
+                    f"[Job {job_id}] Error copying SRT file for speed adjustment: {str(e)}"
+                )
 
-            # Update job status with new paths
-            update_job_status(
-                job_id,
-                "completed",
-                progress=100,
-                audio_path=f"/media/outputs/{job_id}_speed_{speed_factor}_audio.mp3",
-                video_path=f"/media/outputs/{job_id}_speed_{speed_factor}_video.mp4",
-                speed_factor=speed_factor,
-                current_activity=f"Speed adjustment completed successfully",
-            )
+        # Update job status with new paths
+        update_job_status(
+            job_id,
+            "completed",
+            progress=100,
+            audio_path=f"/media/outputs/{job_id}_speed_{speed_factor}_audio.mp3",
+            video_path=f"/media/outputs/{job_id}_speed_{speed_factor}_video.mp4",
+            speed_factor=speed_factor,
+            current_activity=f"Speed adjustment completed successfully",
+        )
 
-            logger.info(f"[Job {job_id}] Speed adjustment completed successfully")
+        logger.info(f"[Job {job_id}] Speed adjustment completed successfully")
 
-        except Exception as e:
-            logger.error(f"Error adjusting speed for job {job_id}: {str(e)}")
-            update_job_status(
-                job_id,
-                "error",
-                progress=0,
-                error=f"Speed adjustment failed: {str(e)}",
-                current_activity=f"Error: Speed adjustment failed - {str(e)}",
-            )
+    except Exception as e:
+        logger.error(f"Error adjusting speed for job {job_id}: {str(e)}")
+        update_job_status(
+            job_id,
+            "error",
+            progress=0,
+            error=f"Speed adjustment failed: {str(e)}",
+            current_activity=f"Error: Speed adjustment failed - {str(e)}",
+        )
 
 
 @app.get("/file-path/{file_type}/{job_id}")
@@ -1587,13 +2016,12 @@ async def download_file(file_type: str, job_id: str):
 if __name__ == "__main__":
     import uvicorn
 
-    # Configure Uvicorn to handle larger file uploads (2GB)
+    # Configure Uvicorn to handle larger file uploads (2GB); jobs and their
+    # WebSocket listeners live in this process, so it runs as a single worker
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        limit_concurrency=5,  # Limit concurrent connections during large uploads
+        limit_concurrency=256,  # Leave room for WebSocket clients alongside uploads
         timeout_keep_alive=300,  # Increased keep-alive timeout for large uploads
-        limit_max_requests=10,  # Limit max requests to prevent memory issues
     )
@@ -2,6 +2,9 @@ import uvicorn
 
 if __name__ == "__main__":
     print("Starting AutoDubber API server...")
+    # uvicorn's default "auto" loop and http settings pick uvloop and httptools
+    # when they're installed (see requirements.txt) and fall back to asyncio
+    # and h11 otherwise, e.g. on Windows where uvloop isn't available
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -1,12 +1,33 @@
 import os
 import sys
-import tempfile
+import subprocess
 import argparse
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
+import functools
+import hashlib
+import random
+import re
+import numpy as np
+from moviepy.editor import VideoFileClip
+from moviepy.audio.AudioClip import AudioArrayClip
+import requests
+import torch
 import whisper  # openai-whisper
-from elevenlabs import generate, set_api_key, voices, Voice, VoiceSettings
+from elevenlabs import set_api_key, voices, Voice, VoiceSettings
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    # CTranslate2 implementation of Whisper, much faster than the reference one
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    HAS_FASTER_WHISPER = True
+except ImportError:
+    HAS_FASTER_WHISPER = False
 
 # --- Configuration ---
 load_dotenv()
@@ -27,6 +48,148 @@ if ELEVENLABS_API_KEY != "dummy_key_will_be_replaced_at_runtime":
 # Default voice ID - Justin
 DEFAULT_VOICE_ID = "uYkKk3J4lEp7IHQ8CLBi"  # Justin voice ID
 
+# Device for Whisper inference ("cuda" or "cpu"); picked automatically if unset
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE")
+
+# Audio longer than TRANSCRIBE_CHUNK_SECONDS is cut at pauses into chunks of
+# about that length, which faster-whisper transcribes TRANSCRIBE_WORKERS at a time
+TRANSCRIBE_CHUNK_SECONDS = int(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "120"))
+TRANSCRIBE_WORKERS = max(
+    1, int(os.getenv("TRANSCRIBE_WORKERS", str((os.cpu_count() or 2) // 2)))
+)
+
+# Guards loading Whisper models, and sharing an openai-whisper model
+whisper_model_lock = threading.Lock()
+whisper_transcribe_lock = threading.Lock()
+
+# ffmpeg executables, honouring the same override as moviepy
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
+
+# H.264 encoder for re-encoding videos; "auto" picks the first hardware encoder
+# that works on this machine and falls back to libx264
+VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", "auto")
+HARDWARE_VIDEO_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox")
+
+# write_videofile options for each encoder, as each takes its own preset names
+# and quality controls. moviepy always passes a -preset; videotoolbox has no
+# presets and ignores it, so it gets a target bitrate instead
+VIDEO_ENCODER_OPTIONS = {
+    "libx264": {"preset": "medium"},
+    "h264_nvenc": {"preset": "p4", "ffmpeg_params": ["-rc", "vbr", "-cq", "23"]},
+    "h264_qsv": {"preset": "medium", "ffmpeg_params": ["-global_quality", "23"]},
+    "h264_videotoolbox": {"bitrate": "8000k"},
+}
+
+# Number of ElevenLabs requests in flight at once, and retries per segment
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "8"))
+TTS_MAX_ATTEMPTS = 6
+# Longest wait between retries of a failed TTS request, in seconds
+TTS_MAX_BACKOFF = 30
+
+# Where generated TTS audio is kept, keyed by everything that affects it, so
+# repeated text and re-runs don't call ElevenLabs again
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "autodubber", "tts"),
+)
+# Size the TTS cache is pruned back to, least recently used files first
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+# Adjacent segments further apart than this many seconds, or whose combined
+# text would be longer than this many characters, are voiced separately
+TTS_MERGE_MAX_GAP = 0.3
+TTS_MERGE_MAX_CHARS = 400
+
+# Segment text with nothing to voice: punctuation only, or sound descriptions
+# such as [Music], (inaudible) or ♪
+UNSPEAKABLE_TEXT_RE = re.compile(r"[\s\[\](),.!?\-…♪]*")
+SOUND_DESCRIPTION_RE = re.compile(r"(?:\s*(?:\[[^\]]*\]|\([^)]*\)|♪[^♪]*♪))+\s*")
+
+# Cap on ElevenLabs requests in flight across all jobs, to stay within the
+# plan's concurrency limit when several jobs generate TTS at once
+ELEVENLABS_MAX_CONCURRENCY = int(
+    os.getenv("ELEVENLABS_MAX_CONCURRENCY", str(TTS_CONCURRENCY))
+)
+elevenlabs_request_slots = threading.BoundedSemaphore(
+    max(1, ELEVENLABS_MAX_CONCURRENCY)
+)
+
+# Requests per minute allowed by the ElevenLabs plan; 0 means no limit
+ELEVENLABS_RPM = int(os.getenv("ELEVENLABS_RPM", "0"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing rate requests per period on average.
+
+    Up to rate requests may go out back to back; after that they are spread
+    evenly over the period instead of bursting into 429 responses.
+    """
+
+    def __init__(self, rate, period=60.0):
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.fill_rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+elevenlabs_rate_limit = TokenBucket(ELEVENLABS_RPM) if ELEVENLABS_RPM > 0 else None
+
+
+class TTSRequestError(Exception):
+    """An ElevenLabs TTS request that came back with an error status"""
+
+    def __init__(self, message, status_code, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# One HTTP session for all TTS requests, so segments reuse open keep-alive
+# connections instead of each paying a new TLS handshake
+elevenlabs_session = requests.Session()
+elevenlabs_session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=1, pool_maxsize=max(1, ELEVENLABS_MAX_CONCURRENCY)),
+)
+
+# ElevenLabs REST API that TTS and voice requests go to
+ELEVENLABS_API_BASE_URL = "https://api.elevenlabs.io/v1"
+
+# ElevenLabs model used for all generated speech
+TTS_MODEL_ID = "eleven_multilingual_v2"  # or "eleven_monolingual_v1"
+
+# Audio format requested from ElevenLabs. Raw "pcm_<rate>" output skips
+# decoding entirely but needs a higher subscription tier than MP3.
+TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "mp3_44100_128")
+
+# Sample rate and channel count of the assembled voiceover track
+VOICEOVER_SAMPLE_RATE = 44100
+VOICEOVER_CHANNELS = 2
+
+# Length of the fade applied where a segment is cut short by the next one
+OVERLAP_FADE_SECONDS = 0.05
+
+# TTS segments decoded at once while mixing; each decode runs in its own
+# ffmpeg process, so they spread across cores
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", str(os.cpu_count() or 1)))
+
 # Voice settings
 VOICE_SETTINGS = VoiceSettings(
     stability=0.7,  # Lower for more expressiveness, higher for more consistency
@@ -40,80 +203,409 @@ VOICE_SETTINGS = VoiceSettings(
 # --- Helper Functions ---
 
 
-def extract_audio_from_video(video_path, audio_output_path):
-    """Extract audio from video file"""
-    print(f"PROGRESS_UPDATE: Extracting audio from video file: {video_path}...")
+def report_progress(progress_callback, message, stage=None):
+    """Report a progress message to the caller, or print it when running from the command line
+
+    Milestone messages also carry a stable ``stage`` token so callers can map
+    them to an overall progress value without parsing the message text.
+    """
+    if progress_callback:
+        progress_callback(message, stage)
+    else:
+        print(f"PROGRESS_UPDATE: {message}")
+
+
+def extract_audio_from_video(video_path, progress_callback=None):
+    """Extract the audio track of a video as 16 kHz mono samples, ready for Whisper"""
+    report_progress(
+        progress_callback,
+        f"Extracting audio from video file: {video_path}...",
+        stage="extracting_audio",
+    )
     try:
-        print(f"PROGRESS_UPDATE: Loading video file...")
-        video_clip = VideoFileClip(video_path)
-        audio_clip = video_clip.audio
-        if audio_clip:
-            print(f"PROGRESS_UPDATE: Writing audio to file...")
-            audio_clip.write_audiofile(
-                audio_output_path, codec="pcm_s16le", verbose=False, logger=None
-            )  # WAV for best Whisper quality
-            audio_clip.close()
-        else:
+        # Decode straight to Whisper's input format, so it doesn't have to run
+        # ffmpeg again on an intermediate WAV file
+        report_progress(progress_callback, "Decoding audio track...")
+        audio = decode_audio(
+            video_path, sample_rate=whisper.audio.SAMPLE_RATE, channels=1
+        ).reshape(-1)
+        if audio.size == 0:
             raise ValueError("Video has no audio track.")
-        video_clip.close()
-        print(f"PROGRESS_UPDATE: Audio extraction completed: {audio_output_path}")
-        return audio_output_path
+        report_progress(
+            progress_callback,
+            f"Audio extraction completed: {audio.size / whisper.audio.SAMPLE_RATE:.2f}s of audio",
+            stage="audio_extracted",
+        )
+        return audio
     except Exception as e:
         print(f"ERROR: Audio extraction failed: {str(e)}")
         raise
 
 
-def transcribe_audio(audio_path, model_size="base"):
-    """Transcribe audio using Whisper"""
-    print(f"PROGRESS_UPDATE: Loading Whisper {model_size} model...")
+def whisper_device():
+    """Return the device Whisper should run on"""
+    if WHISPER_DEVICE:
+        return WHISPER_DEVICE
+    if HAS_FASTER_WHISPER:
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_whisper_model(model_size, device):
+    """Return the Whisper model for a size and device, loading it only once"""
+    # Hold the lock so concurrent jobs don't load the same model twice
+    with whisper_model_lock:
+        return _load_whisper_model(model_size, device)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_whisper_model(model_size, device):
+    if HAS_FASTER_WHISPER:
+        # int8 weights on the CPU, float16 on a CUDA device
+        return WhisperModel(
+            model_size,
+            device=device,
+            compute_type="float16" if device == "cuda" else "int8",
+            # Share the CPU cores between the chunks transcribed in parallel
+            cpu_threads=max(1, (os.cpu_count() or 1) // TRANSCRIBE_WORKERS),
+            num_workers=TRANSCRIBE_WORKERS,
+        )
+    if device == "cuda":
+        # Allow TF32 for the float32 matmuls that fp16 doesn't cover
+        torch.set_float32_matmul_precision("high")
+    return whisper.load_model(model_size, device=device)
+
+
+def split_at_pauses(audio, chunk_seconds):
+    """Split 16 kHz samples into (offset, samples) chunks of about chunk_seconds.
+
+    Cuts are only made in the middle of pauses found by voice activity detection,
+    so no speech is split between chunks.
+    """
+    sample_rate = whisper.audio.SAMPLE_RATE
+    max_samples = int(chunk_seconds * sample_rate)
+    if len(audio) <= max_samples:
+        return [(0.0, audio)]
+
+    speech = get_speech_timestamps(audio, VadOptions())
+    cuts = [0]
+    for previous, following in zip(speech, speech[1:]):
+        # Cut before the next stretch of speech would make the chunk too long
+        if following["end"] - cuts[-1] > max_samples:
+            cuts.append((previous["end"] + following["start"]) // 2)
+    cuts.append(len(audio))
+    return [
+        (start / sample_rate, audio[start:end]) for start, end in zip(cuts, cuts[1:])
+    ]
+
+
+def collect_segments(offset, segments_iter):
+    """Decode faster-whisper's lazy segments, with times relative to the full audio"""
+    return [
+        {"start": offset + seg.start, "end": offset + seg.end, "text": seg.text}
+        for seg in segments_iter
+    ]
+
+
+def transcribe_chunk(model, offset, audio, language=None):
+    """Transcribe one chunk with faster-whisper, with times relative to the full audio"""
+    # The VAD filter skips silent stretches instead of decoding them
+    segments_iter, _ = model.transcribe(audio, vad_filter=True, language=language)
+    return collect_segments(offset, segments_iter)
+
+
+def transcribe_chunks(model, chunks):
+    """Transcribe (offset, samples) chunks in parallel and return their segments in order
+
+    chunks may be a generator; each chunk starts transcribing as soon as it is
+    produced. The language is detected on the first chunk and used for all of
+    them, so one video can't come out in several languages.
+    """
+    chunks = iter(chunks)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return []
+    # transcribe() detects the language up front and only decodes lazily, so
+    # the other chunks can start as soon as the language is known
+    offset, audio = first_chunk
+    first_segments_iter, info = model.transcribe(audio, vad_filter=True)
+
+    with ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS) as executor:
+        first_segments = executor.submit(collect_segments, offset, first_segments_iter)
+        chunk_segments = executor.map(
+            lambda chunk: transcribe_chunk(model, *chunk, language=info.language),
+            chunks,
+        )
+        # map keeps the chunks in order, so the segments stay in order too
+        segments = first_segments.result()
+        for chunk_segment_list in chunk_segments:
+            segments.extend(chunk_segment_list)
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    return segments
+
+
+def stream_audio_chunks(video_path, chunk_seconds=TRANSCRIBE_CHUNK_SECONDS):
+    """Yield (offset, samples) chunks of a video's 16 kHz mono audio as ffmpeg decodes it
+
+    Chunks are cut at pauses like split_at_pauses, so each one can be
+    transcribed while the rest of the audio is still being decoded.
+    """
+    sample_rate = whisper.audio.SAMPLE_RATE
+    chunk_samples = int(chunk_seconds * sample_rate)
+    process = subprocess.Popen(
+        [
+            FFMPEG_BINARY,
+            "-v",
+            "error",
+            "-i",
+            video_path,
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
     try:
-        model = whisper.load_model(model_size)
-        print("PROGRESS_UPDATE: Whisper model loaded, beginning transcription...")
+        offset = 0.0  # Seconds of audio already yielded
+        parts = []
+        buffered = 0
+        split_at = 2 * chunk_samples
+        total_samples = 0
+        while True:
+            # Read ten seconds of samples at a time
+            data = process.stdout.read(sample_rate * 4 * 10)
+            if data:
+                parts.append(np.frombuffer(data, dtype=np.float32))
+                buffered += len(parts[-1])
+                total_samples += len(parts[-1])
+            if data and buffered < split_at:
+                continue
+
+            buffer = np.concatenate(parts) if parts else np.empty(0, np.float32)
+            chunks = split_at_pauses(buffer, chunk_seconds)
+            if data:
+                # The last chunk may end mid-speech, so keep it until more arrives
+                chunks, (tail_offset, tail) = chunks[:-1], chunks[-1]
+            for chunk_offset, samples in chunks:
+                yield offset + chunk_offset, samples
+            if not data:
+                break
+
+            offset += tail_offset
+            parts = [tail]
+            buffered = len(tail)
+            # Without a pause to cut at, wait for another chunk's worth of audio
+            split_at = buffered + chunk_samples if not chunks else 2 * chunk_samples
+
+        process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg could not decode {video_path}: {process.stderr.read().decode(errors='replace').strip()}"
+            )
+        if total_samples == 0:
+            raise ValueError("Video has no audio track.")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def transcribe_video(video_path, model_size="base", progress_callback=None):
+    """Extract and transcribe a video's audio, transcribing chunks while the rest decodes"""
+    if not HAS_FASTER_WHISPER:
+        audio = extract_audio_from_video(video_path, progress_callback)
+        return transcribe_audio(audio, model_size, progress_callback)
+
+    report_progress(
+        progress_callback,
+        f"Loading Whisper {model_size} model...",
+        stage="loading_whisper",
+    )
+    try:
+        model = load_whisper_model(model_size, whisper_device())
+        report_progress(
+            progress_callback,
+            "Whisper model loaded, beginning transcription...",
+            stage="whisper_loaded",
+        )
+        report_progress(
+            progress_callback,
+            f"Extracting and transcribing audio from {video_path}...",
+            stage="transcribing",
+        )
+        segments = transcribe_chunks(model, stream_audio_chunks(video_path))
+        report_progress(
+            progress_callback,
+            "Transcription completed successfully.",
+            stage="transcription_completed",
+        )
+        return segments
+    except Exception as e:
+        print(f"ERROR: Transcription failed: {str(e)}")
+        raise
 
-        # Add a progress indicator for transcription start
-        print("PROGRESS_UPDATE: Transcribing audio with Whisper AI...")
 
-        result = model.transcribe(
-            audio_path, verbose=False, fp16=False
-        )  # fp16=False for CPU, True for GPU if available
+def transcribe_audio(audio, model_size="base", progress_callback=None):
+    """Transcribe audio using Whisper, given a file path or 16 kHz mono samples"""
+    report_progress(
+        progress_callback,
+        f"Loading Whisper {model_size} model...",
+        stage="loading_whisper",
+    )
+    try:
+        device = whisper_device()
+        model = load_whisper_model(model_size, device)
+        report_progress(
+            progress_callback,
+            "Whisper model loaded, beginning transcription...",
+            stage="whisper_loaded",
+        )
+
+        # Add a progress indicator for transcription start
+        report_progress(
+            progress_callback,
+            "Transcribing audio with Whisper AI...",
+            stage="transcribing",
+        )
 
-        print("PROGRESS_UPDATE: Transcription completed successfully.")
-        return result[
-            "segments"
-        ]  # List of dicts: {'id', 'seek', 'start', 'end', 'text', ...}
+        if HAS_FASTER_WHISPER:
+            chunks = (
+                split_at_pauses(audio, TRANSCRIBE_CHUNK_SECONDS)
+                if isinstance(audio, np.ndarray)
+                else [(0.0, audio)]
+            )
+            if len(chunks) > 1:
+                report_progress(
+                    progress_callback,
+                    f"Transcribing {len(chunks)} chunks, {TRANSCRIBE_WORKERS} at a time",
+                )
+            segments = transcribe_chunks(model, chunks)
+        else:
+            # openai-whisper installs decoding hooks on the shared model while
+            # it runs, so only one transcription can use it at a time
+            with whisper_transcribe_lock:
+                result = model.transcribe(
+                    audio, verbose=False, fp16=device == "cuda"
+                )  # fp16 is only supported on the GPU
+            segments = result["segments"]
+
+        report_progress(
+            progress_callback,
+            "Transcription completed successfully.",
+            stage="transcription_completed",
+        )
+        return segments  # List of dicts: {'id', 'start', 'end', 'text', ...}
     except Exception as e:
         print(f"ERROR: Transcription failed: {str(e)}")
         raise
 
 
-def save_srt_file(segments, output_srt_path):
+def format_srt_timestamps(times):
+    """Format a sequence of times in seconds as HH:MM:SS,mmm SRT timestamps"""
+    total_ms = np.round(np.asarray(times, dtype=np.float64) * 1000).astype(np.int64)
+    hours = total_ms // 3_600_000
+    minutes = (total_ms // 60_000) % 60
+    seconds = (total_ms // 1000) % 60
+    millis = total_ms % 1000
+    return [
+        f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+        for h, m, s, ms in zip(
+            hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist()
+        )
+    ]
+
+
+def build_srt(segments):
+    """Render segments as the contents of an SRT file"""
+    starts = format_srt_timestamps([seg["start"] for seg in segments])
+    ends = format_srt_timestamps([seg["end"] for seg in segments])
+    return "".join(
+        f"{i}\n{start_t} --> {end_t}\n{seg['text'].strip()}\n\n"
+        for i, (seg, start_t, end_t) in enumerate(zip(segments, starts, ends), start=1)
+    )
+
+
+def save_srt_file(segments, output_srt_path, progress_callback=None):
     """Save segments as SRT file"""
-    print(f"PROGRESS_UPDATE: Saving transcription to SRT file: {output_srt_path}...")
+    report_progress(
+        progress_callback, f"Saving transcription to SRT file: {output_srt_path}..."
+    )
     try:
+        # Build the whole file first so it's written in one go
+        srt_content = build_srt(segments)
         with open(output_srt_path, "w", encoding="utf-8") as f:
-            for i, seg in enumerate(segments):
-                start_t = whisper.utils.format_timestamp(
-                    seg["start"], always_include_hours=True, decimal_marker=","
-                )
-                end_t = whisper.utils.format_timestamp(
-                    seg["end"], always_include_hours=True, decimal_marker=","
-                )
-                f.write(f"{i+1}\n{start_t} --> {end_t}\n{seg['text'].strip()}\n\n")
-        print(f"PROGRESS_UPDATE: SRT file saved successfully")
+            f.write(srt_content)
+        report_progress(progress_callback, "SRT file saved successfully")
     except Exception as e:
         print(f"ERROR: SRT file save failed: {str(e)}")
         # Continue execution even if SRT save fails
 
 
+def _is_speakable(text):
+    """Whether a segment's text has anything for TTS to say"""
+    text = text.strip()
+    if not text or UNSPEAKABLE_TEXT_RE.fullmatch(text):
+        return False
+    return not SOUND_DESCRIPTION_RE.fullmatch(text)
+
+
+def coalesce_segments(
+    segments, max_gap=TTS_MERGE_MAX_GAP, max_chars=TTS_MERGE_MAX_CHARS
+):
+    """Merge adjacent segments of the same sentence into one segment for TTS.
+
+    A merged segment is closed at a sentence end, at a pause longer than max_gap
+    seconds, or before its text would grow past max_chars. Segments with nothing
+    to voice are dropped.
+    """
+    merged = []
+    current = None
+    for segment in segments:
+        if not _is_speakable(segment["text"]):
+            continue
+        text = segment["text"].strip()
+        if (
+            current is not None
+            and segment["start"] - current["end"] <= max_gap
+            and len(current["text"]) + 1 + len(text) <= max_chars
+        ):
+            current["end"] = segment["end"]
+            current["text"] = f"{current['text']} {text}"
+        else:
+            current = {"start": segment["start"], "end": segment["end"], "text": text}
+            merged.append(current)
+        if text.endswith((".", "!", "?")):
+            current = None
+    return merged
+
+
 def generate_tts_for_segments(
-    segments, voice_id, voice_settings, temp_dir, speed_factor=1.0
+    segments,
+    voice_id,
+    voice_settings,
+    speed_factor=1.0,
+    progress_callback=None,
+    cache_dir=TTS_CACHE_DIR,
+    api_key=None,
 ):
-    """Generates TTS for each segment and returns a list of segment info dictionaries"""
-    print(
-        f"PROGRESS_UPDATE: Generating TTS with ElevenLabs voice ID {voice_id} (speed factor: {speed_factor})"
+    """Generates TTS for each segment and returns a list of segment info dictionaries
+
+    Requests are made with api_key, or the key from the environment if None.
+    """
+    api_key = api_key or ELEVENLABS_API_KEY
+    report_progress(
+        progress_callback,
+        f"Generating TTS with ElevenLabs voice ID {voice_id} (speed factor: {speed_factor})",
+        stage="generating_tts",
     )
-    tts_clips_info = []
-
     # Apply speed to voice settings
     # Create a new voice settings object with the specified speed
     settings_with_speed = VoiceSettings(
@@ -128,55 +620,70 @@ def generate_tts_for_segments(
         speed=speed_factor,  # Apply the requested speed factor
     )
 
+    voice = Voice(voice_id=voice_id, settings=settings_with_speed)
+
+    # Drop segments with nothing to voice and send short neighbouring pieces
+    # of a sentence in one request
+    segments = coalesce_segments(segments)
+
     # Count total characters for estimation
     total_chars = sum(len(segment["text"].strip()) for segment in segments)
     processed_chars = 0
     start_time = time.time()
 
-    print(
-        f"PROGRESS_UPDATE: Starting TTS generation for {len(segments)} segments, {total_chars} total characters"
+    report_progress(
+        progress_callback,
+        f"Starting TTS generation for {len(segments)} segments, {total_chars} total characters",
     )
 
-    for i, segment in enumerate(segments):
-        text = segment["text"].strip()
-        start_time_sec = segment["start"]  # seconds
-        end_time_sec = segment["end"]  # seconds
+    # The requests are network bound, so send several at once
+    segment_results = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=TTS_CONCURRENCY) as executor:
+        futures = {}
+        for i, segment in enumerate(segments):
+            text = segment["text"]
+            future = executor.submit(
+                synthesize_segment, text, voice, api_key, cache_dir
+            )
+            futures[future] = (i, segment, text)
 
-        # Progress reporting
-        processed_chars += len(text)
-        progress = processed_chars / total_chars * 100 if total_chars > 0 else 0
-        elapsed = time.time() - start_time
+        for completed, future in enumerate(as_completed(futures), start=1):
+            i, segment, text = futures[future]
 
-        # Calculate segment percentage for better tracking
-        segment_percent = (i + 1) / len(segments) * 100
+            # Calculate segment percentage for better tracking
+            segment_percent = completed / len(futures) * 100
 
-        print(
-            f"PROGRESS_UPDATE: TTS generating segment {i+1}/{len(segments)} [{progress:.1f}%] (segment {segment_percent:.0f}%) - \"{text[:50]}{'...' if len(text) > 50 else ''}\""
-        )
+            try:
+                segment_audio = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"ERROR: TTS generation failed for segment {i+1}: {str(e)}")
+                report_progress(
+                    progress_callback,
+                    f"TTS failed for segment {i+1}/{len(segments)} (segment {segment_percent:.0f}%), leaving it silent",
+                    stage="tts_segment",
+                )
+                continue
 
-        if not text:
-            print(f"PROGRESS_UPDATE: Skipping empty segment {i+1}")
-            continue
+            # Progress reporting
+            processed_chars += len(text)
+            progress = processed_chars / total_chars * 100 if total_chars > 0 else 0
+            elapsed = time.time() - start_time
 
-        try:
-            # Generate audio using the specific voice and settings with speed factor
-            audio_data = generate(
-                text=text,
-                voice=Voice(voice_id=voice_id, settings=settings_with_speed),
-                model="eleven_multilingual_v2",  # or "eleven_monolingual_v1"
-            )
-            segment_audio_path = os.path.join(temp_dir, f"segment_{i:04d}.mp3")
-            with open(segment_audio_path, "wb") as f:
-                f.write(audio_data)
-            tts_clips_info.append(
-                {
-                    "start": start_time_sec,
-                    "end": end_time_sec,
-                    "path": segment_audio_path,
-                    "text": text,
-                }
+            report_progress(
+                progress_callback,
+                f"TTS generated segment {i+1}/{len(segments)} [{progress:.1f}%] (segment {segment_percent:.0f}%) - \"{text[:50]}{'...' if len(text) > 50 else ''}\"",
+                stage="tts_segment",
             )
 
+            segment_results[i] = {
+                "start": segment["start"],
+                "end": segment["end"],
+                "audio": segment_audio,
+                "text": text,
+            }
+
             # Estimate remaining time
             if processed_chars > 0 and elapsed > 0:
                 chars_per_second = processed_chars / elapsed
@@ -184,79 +691,479 @@ def generate_tts_for_segments(
                 remaining_time = (
                     remaining_chars / chars_per_second if chars_per_second > 0 else 0
                 )
-                print(
-                    f"PROGRESS_UPDATE: Estimated TTS time remaining: {remaining_time:.1f} seconds"
+                report_progress(
+                    progress_callback,
+                    f"Estimated TTS time remaining: {remaining_time:.1f} seconds",
                 )
 
-        except Exception as e:
-            print(f"ERROR: TTS generation failed for segment {i+1}: {str(e)}")
-            continue
+    # Keep the clips in segment order regardless of which request finished first
+    tts_clips_info = [segment_results[i] for i in sorted(segment_results)]
 
-    print(
-        f"PROGRESS_UPDATE: TTS generation complete for all {len(segments)} segments, total {processed_chars} characters"
+    if cache_dir:
+        prune_tts_cache(cache_dir)
+
+    report_progress(
+        progress_callback,
+        f"TTS generation complete for {len(segments) - failed}/{len(segments)} segments, total {processed_chars} characters",
     )
     return tts_clips_info
 
 
-def create_composite_voiceover(tts_clips_info, total_duration):
-    """Creates a single voiceover track from individual TTS clips, respecting original timing"""
-    print("PROGRESS_UPDATE: Creating composite voiceover track from segments...")
+def request_tts(text, voice, api_key):
+    """Request speech for a piece of text over the shared ElevenLabs session"""
+    response = elevenlabs_session.post(
+        f"{ELEVENLABS_API_BASE_URL}/text-to-speech/{voice.voice_id}",
+        json={
+            "text": text,
+            "model_id": TTS_MODEL_ID,
+            "voice_settings": (voice.settings.model_dump() if voice.settings else None),
+        },
+        params={"output_format": TTS_OUTPUT_FORMAT},
+        # Passed per request, as concurrent jobs may use different accounts
+        headers={"xi-api-key": api_key},
+        timeout=120,
+    )
+    if response.status_code != 200:
+        retry_after = response.headers.get("Retry-After", "")
+        raise TTSRequestError(
+            f"ElevenLabs TTS request failed with status {response.status_code}: {response.text}",
+            response.status_code,
+            float(retry_after) if retry_after.isdigit() else None,
+        )
+    return response.content
+
+
+def is_retryable_tts_error(error):
+    """Whether a failed TTS request may succeed if sent again"""
+    # Rate limits, server errors and network trouble are transient; a bad key,
+    # exhausted quota or rejected text fails the same way every time
+    if isinstance(error, TTSRequestError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def tts_retry_delay(attempt, error):
+    """Seconds to wait before retrying a failed TTS request"""
+    # Honour the server's Retry-After on 429s, otherwise back off
+    # exponentially with jitter so parallel requests don't retry in lockstep
+    if isinstance(error, TTSRequestError) and error.retry_after is not None:
+        return min(error.retry_after, TTS_MAX_BACKOFF)
+    return min(2 ** (attempt - 1), TTS_MAX_BACKOFF) * random.uniform(0.5, 1.0)
+
+
+def tts_cache_path(cache_dir, text, voice, api_key):
+    """Return the cache file for a piece of text spoken with the given voice"""
+    settings = voice.settings.model_dump_json() if voice.settings else ""
+    # Each account gets its own entries, so nobody is served audio generated
+    # with someone else's voices or quota
+    account = hashlib.sha256(api_key.encode()).hexdigest()
+    key = hashlib.blake2b(
+        f"{account}|{voice.voice_id}|{settings}|{TTS_MODEL_ID}|{TTS_OUTPUT_FORMAT}|{text}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return os.path.join(cache_dir, key[:2], f"{key}.{TTS_OUTPUT_FORMAT.split('_')[0]}")
+
+
+def prune_tts_cache(cache_dir, max_bytes=TTS_CACHE_MAX_BYTES):
+    """Delete the least recently used cache files until the cache fits in max_bytes"""
+    entries = []
+    total_bytes = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed by a concurrent prune
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+    if total_bytes <= max_bytes:
+        return
+
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_bytes -= size
+        if total_bytes <= max_bytes:
+            break
+
+
+def synthesize_segment(text, voice, api_key, cache_dir=None):
+    """Generate TTS audio for one segment, rate limited and retried with backoff"""
+    cache_path = tts_cache_path(cache_dir, text, voice, api_key) if cache_dir else None
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                audio_data = f.read()
+            # Touch the file so pruning sees it as recently used
+            os.utime(cache_path)
+            return audio_data
+        except FileNotFoundError:
+            pass
+
+    for attempt in range(1, TTS_MAX_ATTEMPTS + 1):
+        try:
+            if elevenlabs_rate_limit:
+                elevenlabs_rate_limit.acquire()
+            with elevenlabs_request_slots:
+                audio_data = request_tts(text, voice, api_key)
+            break
+        except Exception as e:
+            if attempt == TTS_MAX_ATTEMPTS or not is_retryable_tts_error(e):
+                raise
+            time.sleep(tts_retry_delay(attempt, e))
+
+    if cache_path:
+        try:
+            # Write to a temporary name first so readers never see a partial file
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(audio_data)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"WARNING: Could not cache TTS audio: {str(e)}")
+    return audio_data
+
+
+def decode_audio(
+    source,
+    sample_rate=VOICEOVER_SAMPLE_RATE,
+    channels=VOICEOVER_CHANNELS,
+    input_format=(),
+):
+    """Decode audio with ffmpeg into a float32 array of shape (samples, channels)
+
+    source is a file path, or the encoded audio itself as bytes. input_format
+    holds ffmpeg input options for sources it can't detect, like raw PCM.
+    """
+    from_memory = isinstance(source, (bytes, bytearray, memoryview))
+    result = subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-v",
+            "error",
+            *input_format,
+            "-i",
+            "pipe:0" if from_memory else source,
+            "-f",
+            "f32le",
+            "-acodec",
+            "pcm_f32le",
+            "-ac",
+            str(channels),
+            "-ar",
+            str(sample_rate),
+            "-",
+        ],
+        input=source if from_memory else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg could not decode {'audio data' if from_memory else source}: {result.stderr.decode(errors='replace').strip()}"
+        )
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, channels)
+
+
+def decode_tts_audio(audio_data, sample_rate=VOICEOVER_SAMPLE_RATE):
+    """Turn audio returned by ElevenLabs into float32 samples at sample_rate"""
+    if TTS_OUTPUT_FORMAT.startswith("pcm_"):
+        pcm_rate = int(TTS_OUTPUT_FORMAT.split("_")[1])
+        if pcm_rate == sample_rate:
+            # Already 16-bit mono at the right rate, so just rescale it; the
+            # single channel is spread over both when mixed
+            samples = np.frombuffer(audio_data, dtype="<i2").astype(np.float32)
+            return (samples / 32768.0).reshape(-1, 1)
+        return decode_audio(
+            audio_data,
+            sample_rate=sample_rate,
+            input_format=("-f", "s16le", "-ar", str(pcm_rate), "-ac", "1"),
+        )
+    return decode_audio(audio_data, sample_rate=sample_rate)
+
+
+def fade_out_tail(samples, sample_rate):
+    """Return a copy of samples whose last OVERLAP_FADE_SECONDS fade out smoothly"""
+    samples = samples.copy()
+    fade_length = min(len(samples), int(OVERLAP_FADE_SECONDS * sample_rate))
+    if fade_length:
+        # Raised-cosine ramp from 1 to 0, so the cut doesn't click
+        ramp = 0.5 * (1 + np.cos(np.linspace(0, np.pi, fade_length, dtype=np.float32)))
+        samples[-fade_length:] *= ramp[:, np.newaxis]
+    return samples
+
+
+def mix_voiceover(tts_clips_info, total_duration, progress_callback=None):
+    """Mixes individual TTS clips into one float32 PCM buffer, respecting original timing"""
+    report_progress(
+        progress_callback,
+        "Creating composite voiceover track from segments...",
+        stage="voiceover_assembly",
+    )
     if not tts_clips_info:
         print("WARNING: No TTS clips to composite. Returning empty audio.")
-        return AudioFileClip(duration=total_duration, fps=44100)
-
-    final_audio_segments = []
 
-    # Default fps value to use
-    default_fps = 44100  # Standard audio sampling rate
+    sample_rate = VOICEOVER_SAMPLE_RATE
 
-    print(
-        f"PROGRESS_UPDATE: Processing {len(tts_clips_info)} audio segments for composition"
+    report_progress(
+        progress_callback,
+        f"Processing {len(tts_clips_info)} audio segments for composition",
     )
 
-    for i, clip_info in enumerate(tts_clips_info):
+    # Decode every segment once, several at a time, remembering the sample it
+    # starts at
+    def decode_segment(indexed_clip):
+        i, clip_info = indexed_clip
         try:
-            print(
-                f"PROGRESS_UPDATE: Adding audio segment {i+1}/{len(tts_clips_info)} to voiceover (starts at {clip_info['start']:.2f}s)"
+            report_progress(
+                progress_callback,
+                f"Adding audio segment {i+1}/{len(tts_clips_info)} to voiceover (starts at {clip_info['start']:.2f}s)",
             )
-            audio_segment = AudioFileClip(clip_info["path"])
-            # Set the start time of this clip in the composite audio
-            audio_segment = audio_segment.set_start(clip_info["start"])
-            final_audio_segments.append(audio_segment)
+            samples = decode_tts_audio(clip_info["audio"], sample_rate=sample_rate)
+            return int(round(clip_info["start"] * sample_rate)), samples
         except Exception as e:
             print(
                 f"ERROR: Failed to add segment starting at {clip_info['start']}: {str(e)}"
             )
-            continue
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, DECODE_WORKERS)) as executor:
+        decoded_segments = [
+            segment
+            for segment in executor.map(decode_segment, enumerate(tts_clips_info))
+            if segment is not None
+        ]
+
+    # Speech running into the next segment would be mixed over it, so cut it
+    # off where the next one starts
+    decoded_segments.sort(key=lambda segment: segment[0])
+    for i in range(len(decoded_segments) - 1):
+        start_sample, samples = decoded_segments[i]
+        available = decoded_segments[i + 1][0] - start_sample
+        if len(samples) > available:
+            print(
+                f"WARNING: Segment at {start_sample / sample_rate:.2f}s overlaps the next by {(len(samples) - available) / sample_rate:.2f}s, trimming it"
+            )
+            decoded_segments[i] = (
+                start_sample,
+                fade_out_tail(samples[: max(available, 0)], sample_rate),
+            )
 
-    # Create the composite audio
-    print(
-        f"PROGRESS_UPDATE: Compositing {len(final_audio_segments)} audio segments into final voiceover track"
+    # The track lasts at least as long as the video, longer if the last segment
+    # runs over; with no known video duration it ends with the last segment
+    total_samples = int(round((total_duration or 0) * sample_rate))
+    for start_sample, samples in decoded_segments:
+        total_samples = max(total_samples, start_sample + len(samples))
+
+    # Mix the segments into one buffer; overlapping segments add up
+    report_progress(
+        progress_callback,
+        f"Compositing {len(decoded_segments)} audio segments into final voiceover track",
+    )
+    mix = np.zeros((total_samples, VOICEOVER_CHANNELS), dtype=np.float32)
+    for start_sample, samples in decoded_segments:
+        mix[start_sample : start_sample + len(samples)] += samples
+
+    # Overlapping segments can sum past full scale; clamp in place so the
+    # encoders get valid samples
+    np.clip(mix, -1.0, 1.0, out=mix)
+
+    report_progress(
+        progress_callback,
+        f"Voiceover assembly completed. Duration: {total_samples / sample_rate:.2f}s",
+        stage="voiceover_completed",
     )
-    composite_audio = CompositeAudioClip(final_audio_segments)
+    return mix
 
-    # Explicitly set fps attribute which is required by some operations
-    if not hasattr(composite_audio, "fps") or composite_audio.fps is None:
-        print(
-            f"PROGRESS_UPDATE: Setting default audio sampling rate to {default_fps}Hz"
-        )
-        composite_audio.fps = default_fps
 
-    # Ensure the composite audio has a defined duration
-    max_end_time = 0
-    if final_audio_segments:
-        for clip in final_audio_segments:
-            clip_end = clip.start + clip.duration
-            if clip_end > max_end_time:
-                max_end_time = clip_end
+def create_composite_voiceover(tts_clips_info, total_duration, progress_callback=None):
+    """Creates a single voiceover track from individual TTS clips, respecting original timing"""
+    mix = mix_voiceover(tts_clips_info, total_duration, progress_callback)
+    return AudioArrayClip(mix, fps=VOICEOVER_SAMPLE_RATE)
+
+
+def probe_duration(media_path):
+    """Return the duration of a media file in seconds, or None if it can't be read
+
+    The container's duration from ffprobe is used when it has one; otherwise
+    the file is decoded to find where it ends.
+    """
+    result = subprocess.run(
+        [
+            FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            media_path,
+        ],
+        capture_output=True,
+    )
+    if result.returncode == 0:
+        try:
+            return float(result.stdout)
+        except ValueError:
+            pass  # some containers report "N/A" or no duration at all
+    print(f"WARNING: ffprobe reported no duration for {media_path}, decoding it")
+    return decoded_duration(media_path)
+
+
+def decoded_duration(media_path):
+    """Return how long a media file runs by decoding it, or None if that fails"""
+    # The audio alone is enough to find the end and much cheaper to decode;
+    # files without audio fall back to decoding the video
+    for stream_args in (("-vn",), ()):
+        result = subprocess.run(
+            [
+                FFMPEG_BINARY,
+                "-v",
+                "error",
+                "-nostats",
+                "-i",
+                media_path,
+                *stream_args,
+                "-f",
+                "null",
+                "-progress",
+                "pipe:1",
+                "-",
+            ],
+            capture_output=True,
+        )
+        end_us = [
+            line.split(b"=", 1)[1]
+            for line in result.stdout.splitlines()
+            if line.startswith(b"out_time_us=")
+        ]
+        if result.returncode == 0 and end_us and end_us[-1].isdigit():
+            duration = int(end_us[-1]) / 1_000_000
+            if duration > 0:
+                return duration
+    return None
+
+
+def clip_samples(audio_clip):
+    """Return an audio clip's samples at VOICEOVER_SAMPLE_RATE as a numpy array"""
+    # An AudioArrayClip at the right rate already holds the samples, so skip
+    # moviepy's frame-by-frame resampling
+    if (
+        isinstance(audio_clip, AudioArrayClip)
+        and audio_clip.fps == VOICEOVER_SAMPLE_RATE
+    ):
+        return audio_clip.array
+    return audio_clip.to_soundarray(fps=VOICEOVER_SAMPLE_RATE)
+
+
+def copy_mux_args(video_input, audio_input, output_video_path):
+    """ffmpeg arguments copying input video_input's video and encoding audio_input's audio
+
+    Shared by every path that replaces a video's audio without re-encoding it.
+    """
+    return [
+        "-map",
+        f"{video_input}:v:0",
+        "-map",
+        f"{audio_input}:a:0",
+        "-c:v",
+        "copy",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "192k",
+        # Pad short audio with silence and cut at the end of the video
+        "-af",
+        "apad",
+        "-shortest",
+        output_video_path,
+    ]
+
+
+def mux_audio_samples(video_path, samples, output_video_path):
+    """Replace a video's audio with the given samples, copying the video stream as is"""
+    samples = np.ascontiguousarray(samples, dtype=np.float32)
+    result = subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-y",
+            "-v",
+            "error",
+            "-f",
+            "f32le",
+            "-ar",
+            str(VOICEOVER_SAMPLE_RATE),
+            "-ac",
+            str(samples.shape[1]),
+            "-i",
+            "pipe:0",
+            "-i",
+            video_path,
+            *copy_mux_args(1, 0, output_video_path),
+        ],
+        input=memoryview(samples).cast("B"),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg could not mux {video_path}: {result.stderr.decode(errors='replace').strip()}"
+        )
 
-    final_duration = max(total_duration, max_end_time)
-    composite_audio = composite_audio.set_duration(final_duration)
 
-    print(
-        f"PROGRESS_UPDATE: Voiceover assembly completed. Duration: {composite_audio.duration:.2f}s"
+def video_encoder_args(encoder):
+    """ffmpeg arguments for the options VIDEO_ENCODER_OPTIONS sets for an encoder"""
+    options = VIDEO_ENCODER_OPTIONS.get(encoder, {})
+    args = []
+    if "preset" in options:
+        args += ["-preset", options["preset"]]
+    if "bitrate" in options:
+        args += ["-b:v", options["bitrate"]]
+    return args + options.get("ffmpeg_params", [])
+
+
+@functools.lru_cache(maxsize=None)
+def detect_video_encoder():
+    """Return the first hardware H.264 encoder that works here, or libx264"""
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-encoders"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    return composite_audio
+    listed = result.stdout.decode(errors="replace")
+    for encoder in HARDWARE_VIDEO_ENCODERS:
+        if encoder not in listed:
+            continue
+        # Builds often list encoders the machine has no hardware for, so check
+        # that a short test encode actually succeeds
+        probe = subprocess.run(
+            [
+                FFMPEG_BINARY,
+                "-v",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "color=size=256x256:duration=0.1",
+                "-c:v",
+                encoder,
+                # Test with the options the real encode will use
+                *video_encoder_args(encoder),
+                "-f",
+                "null",
+                "-",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if probe.returncode == 0:
+            return encoder
+    return "libx264"
 
 
 def create_final_video(
@@ -265,59 +1172,109 @@ def create_final_video(
     output_video_path,
     burn_subtitles=False,
     srt_path=None,
+    progress_callback=None,
+    video_encoder=None,
+    copy_video=True,
 ):
-    """Create final video with new audio and optionally burn subtitles"""
-    print(f"PROGRESS_UPDATE: Creating final video with voiceover: {output_video_path}")
+    """Create final video with new audio and optionally burn subtitles
+
+    Unless copy_video is False, the video stream is copied as is when no
+    subtitles are burned in.
+    """
+    report_progress(
+        progress_callback,
+        f"Creating final video with voiceover: {output_video_path}",
+        stage="creating_video",
+    )
 
     # Debug logging
-    print(f"PROGRESS_UPDATE: burn_subtitles={burn_subtitles}, srt_path={srt_path}")
+    report_progress(
+        progress_callback, f"burn_subtitles={burn_subtitles}, srt_path={srt_path}"
+    )
     if srt_path:
-        print(f"PROGRESS_UPDATE: SRT file exists: {os.path.exists(srt_path)}")
+        report_progress(
+            progress_callback, f"SRT file exists: {os.path.exists(srt_path)}"
+        )
 
     if burn_subtitles and srt_path and os.path.exists(srt_path):
-        print(
-            f"PROGRESS_UPDATE: Subtitle burning enabled - will embed subtitles from {srt_path}"
+        report_progress(
+            progress_callback,
+            f"Subtitle burning enabled - will embed subtitles from {srt_path}",
         )
     else:
-        print(
-            f"PROGRESS_UPDATE: Subtitle burning skipped - burn_subtitles={burn_subtitles}, srt_path={srt_path}, exists={os.path.exists(srt_path) if srt_path else False}"
+        report_progress(
+            progress_callback,
+            f"Subtitle burning skipped - burn_subtitles={burn_subtitles}, srt_path={srt_path}, exists={os.path.exists(srt_path) if srt_path else False}",
+        )
+    # Without burned subtitles the frames are unchanged, so try copying the
+    # original video stream and only encoding the new audio, without loading
+    # the video in moviepy at all
+    if copy_video and not (burn_subtitles and srt_path and os.path.exists(srt_path)):
+        report_progress(
+            progress_callback,
+            "Copying the original video stream with the new audio...",
+            stage="encoding_video",
         )
+        try:
+            mux_audio_samples(
+                original_video_path,
+                clip_samples(voiceover_audio_clip),
+                output_video_path,
+            )
+            voiceover_audio_clip.close()
+            report_progress(
+                progress_callback,
+                "Final video creation completed successfully!",
+                stage="video_completed",
+            )
+            return
+        except Exception as e:
+            # e.g. the source codec can't be stored in the output container
+            print(f"WARNING: Copying the video stream failed, re-encoding: {e}")
+
     try:
-        print(
-            f"PROGRESS_UPDATE: Loading original video for processing: {original_video_path}"
+        report_progress(
+            progress_callback,
+            f"Loading original video for processing: {original_video_path}",
         )
         original_video = VideoFileClip(original_video_path)
 
         # Mute original video
-        print(f"PROGRESS_UPDATE: Muting original video audio track")
+        report_progress(progress_callback, f"Muting original video audio track")
         video_muted = original_video.without_audio()
 
         # Ensure audio clip has fps attribute
         if not hasattr(voiceover_audio_clip, "fps") or voiceover_audio_clip.fps is None:
-            print("PROGRESS_UPDATE: Setting default audio sampling rate to 44100Hz")
+            report_progress(
+                progress_callback, "Setting default audio sampling rate to 44100Hz"
+            )
             voiceover_audio_clip.fps = 44100
 
         # Set the new voiceover
-        print(f"PROGRESS_UPDATE: Applying new voiceover audio to video")
+        report_progress(progress_callback, f"Applying new voiceover audio to video")
         final_video = video_muted.set_audio(voiceover_audio_clip)
 
         # Ensure the voiceover duration doesn't exceed video duration
         if final_video.audio and final_video.audio.duration > final_video.duration:
-            print(
-                f"PROGRESS_UPDATE: Trimming audio to match video duration ({final_video.duration:.2f}s)"
+            report_progress(
+                progress_callback,
+                f"Trimming audio to match video duration ({final_video.duration:.2f}s)",
             )
             final_video.audio = final_video.audio.subclip(0, final_video.duration)
 
         # Add subtitles if requested
         if burn_subtitles and srt_path and os.path.exists(srt_path):
-            print(f"PROGRESS_UPDATE: Burning subtitles into video from {srt_path}")
+            report_progress(
+                progress_callback, f"Burning subtitles into video from {srt_path}"
+            )
             try:
                 # Parse SRT file manually (your existing parse_srt function is fine)
                 subtitles = parse_srt(srt_path)
 
                 if subtitles:
-                    print(
-                        f"PROGRESS_UPDATE: Importing moviepy components for subtitle rendering"
+                    report_progress(
+                        progress_callback,
+                        f"Importing moviepy components for subtitle rendering",
                     )
                     # ColorClip is no longer needed for this method of subtitle background
                     from moviepy.video.VideoClip import TextClip
@@ -329,8 +1286,9 @@ def create_final_video(
 
                     subtitle_clips = []
                     for i, sub in enumerate(subtitles):
-                        print(
-                            f"PROGRESS_UPDATE: Creating subtitle clip {i+1}/{len(subtitles)}: '{sub['text'][:50]}...'"
+                        report_progress(
+                            progress_callback,
+                            f"Creating subtitle clip {i+1}/{len(subtitles)}: '{sub['text'][:50]}...'",
                         )
                         try:
                             # Create TextClip with white text and a black background strip
@@ -364,8 +1322,9 @@ def create_final_video(
                             )
 
                             subtitle_clips.append(positioned_subtitle_clip)
-                            print(
-                                f"PROGRESS_UPDATE: Successfully created subtitle clip {i+1} with white text on black background strip"
+                            report_progress(
+                                progress_callback,
+                                f"Successfully created subtitle clip {i+1} with white text on black background strip",
                             )
                         except Exception as clip_error:
                             print(
@@ -381,50 +1340,80 @@ def create_final_video(
 
                     # Composite video with subtitles
                     if subtitle_clips:
-                        print(
-                            f"PROGRESS_UPDATE: Compositing video with {len(subtitle_clips)} subtitle clips"
+                        report_progress(
+                            progress_callback,
+                            f"Compositing video with {len(subtitle_clips)} subtitle clips",
                         )
                         # Add subtitle clips on top of the existing final_video (which has the new audio)
                         final_video = CompositeVideoClip([final_video] + subtitle_clips)
-                        print(
-                            f"PROGRESS_UPDATE: Successfully burned {len(subtitle_clips)} subtitle segments into video"
+                        report_progress(
+                            progress_callback,
+                            f"Successfully burned {len(subtitle_clips)} subtitle segments into video",
                         )
                     else:
-                        print(
-                            f"PROGRESS_UPDATE: No subtitle clips created to burn (either no subtitles in SRT or all failed)"
+                        report_progress(
+                            progress_callback,
+                            f"No subtitle clips created to burn (either no subtitles in SRT or all failed)",
                         )
                 else:
-                    print(f"PROGRESS_UPDATE: No subtitles parsed from SRT file")
+                    report_progress(
+                        progress_callback, f"No subtitles parsed from SRT file"
+                    )
 
             except Exception as e:
                 print(f"ERROR: Failed to burn subtitles: {str(e)}")
                 import traceback
 
                 print(f"ERROR: Subtitle burning traceback: {traceback.format_exc()}")
-                print(f"PROGRESS_UPDATE: Continuing without subtitles...")
+                report_progress(progress_callback, f"Continuing without subtitles...")
                 # Video will be created without subtitles if burning process fails
 
-        # ... (rest of the function: write_videofile, cleanup) ...
-        print("PROGRESS_UPDATE: Encoding final video (this may take a while)...")
-        final_video.write_videofile(  # This final_video object now includes subtitles if they were added
-            output_video_path,
-            codec="libx264",
-            audio_codec="aac",
-            threads=4,
-            preset="medium",
-            verbose=False,
-            logger=None,
+        # Subtitles were burned, or copying the stream failed, so re-encode
+        encoder = video_encoder or VIDEO_ENCODER
+        if encoder == "auto":
+            encoder = detect_video_encoder()
+        report_progress(
+            progress_callback,
+            f"Encoding final video with {encoder} (this may take a while)...",
+            stage="encoding_video",
         )
+        try:
+            final_video.write_videofile(  # This final_video object now includes subtitles if they were added
+                output_video_path,
+                codec=encoder,
+                audio_codec="aac",
+                threads=4,
+                verbose=False,
+                logger=None,
+                **VIDEO_ENCODER_OPTIONS.get(encoder, {}),
+            )
+        except Exception as e:
+            if encoder == "libx264":
+                raise
+            print(f"WARNING: Encoding with {encoder} failed, using libx264: {e}")
+            final_video.write_videofile(
+                output_video_path,
+                codec="libx264",
+                audio_codec="aac",
+                threads=4,
+                verbose=False,
+                logger=None,
+                **VIDEO_ENCODER_OPTIONS["libx264"],
+            )
 
         # Clean up
-        print("PROGRESS_UPDATE: Closing video and audio objects")
+        report_progress(progress_callback, "Closing video and audio objects")
         original_video.close()
         video_muted.close()
         if voiceover_audio_clip and hasattr(voiceover_audio_clip, "close"):
             voiceover_audio_clip.close()
         final_video.close()
 
-        print("PROGRESS_UPDATE: Final video creation completed successfully!")
+        report_progress(
+            progress_callback,
+            "Final video creation completed successfully!",
+            stage="video_completed",
+        )
     except Exception as e:
         print(f"ERROR: Video creation failed: {str(e)}")
         # Clean up if possible
@@ -455,6 +1444,20 @@ def list_available_voices():
         return []
 
 
+def fetch_voices(api_key):
+    """Fetch the voices available to an ElevenLabs account, as dicts from the API"""
+    # The key goes in the request itself rather than through set_api_key, so
+    # concurrent callers with different keys don't see each other's voices
+    response = elevenlabs_session.get(
+        f"{ELEVENLABS_API_BASE_URL}/voices", headers={"xi-api-key": api_key}, timeout=30
+    )
+    if response.status_code != 200:
+        raise Exception(
+            f"ElevenLabs voices request failed with status {response.status_code}: {response.text}"
+        )
+    return response.json().get("voices", [])
+
+
 def parse_arguments():
     """Parse command-line arguments"""
     parser = argparse.ArgumentParser(
@@ -482,6 +1485,11 @@ def parse_arguments():
         "-v", "--voice-id", help="ElevenLabs voice ID", default=DEFAULT_VOICE_ID
     )
     parser.add_argument("-s", "--srt", help="Save SRT file", action="store_true")
+    parser.add_argument(
+        "--encoder",
+        help="H.264 encoder used when the video must be re-encoded, e.g. h264_nvenc",
+        default=VIDEO_ENCODER,
+    )
     parser.add_argument(
         "--list-voices", help="List available ElevenLabs voices", action="store_true"
     )
@@ -507,55 +1515,51 @@ if __name__ == "__main__":
         print(f"Error: Input video '{input_video}' not found.")
         sys.exit(1)
 
-    # Create a temporary directory for intermediate files
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"Temporary directory: {temp_dir}")
-
-        try:
-            # 1. Extract audio
-            extracted_audio_path = os.path.join(temp_dir, "extracted_audio.wav")
-            extract_audio_from_video(input_video, extracted_audio_path)
-
-            # 2. Transcribe to get segments (text with timestamps)
-            segments = transcribe_audio(extracted_audio_path, model_size=model_size)
-
-            if not segments:
-                print("No segments transcribed. Exiting.")
-                sys.exit(1)
-
-            # Optionally save SRT
-            if args.srt:
-                srt_path = os.path.splitext(output_video)[0] + ".srt"
-                save_srt_file(segments, srt_path)
+    try:
+        # 1-2. Extract the audio and transcribe it to get segments (text with timestamps)
+        segments = transcribe_video(input_video, model_size=model_size)
 
-            # 3. Generate TTS for each segment
-            tts_clips_info = generate_tts_for_segments(
-                segments, args.voice_id, VOICE_SETTINGS, temp_dir
-            )
+        if not segments:
+            print("No segments transcribed. Exiting.")
+            sys.exit(1)
 
-            if not tts_clips_info:
-                print("No TTS clips were generated. The final video will be silent.")
-                original_video_for_duration = VideoFileClip(input_video)
-                video_duration = original_video_for_duration.duration
-                original_video_for_duration.close()
-                voiceover_track = AudioFileClip(duration=video_duration)
-            else:
-                # 4. Combine TTS audio segments into a single voiceover track
-                original_video_for_duration = VideoFileClip(input_video)
-                video_duration = original_video_for_duration.duration
-                original_video_for_duration.close()
-
-                voiceover_track = create_composite_voiceover(
-                    tts_clips_info, video_duration
-                )
+        # Optionally save SRT, in the background while the TTS is generated
+        srt_path = None
+        srt_future = None
+        if args.srt:
+            srt_path = os.path.splitext(output_video)[0] + ".srt"
+            srt_writer = ThreadPoolExecutor(max_workers=1)
+            srt_future = srt_writer.submit(save_srt_file, segments, srt_path)
+            srt_writer.shutdown(wait=False)
+
+        # 3. Generate TTS for each segment
+        tts_clips_info = generate_tts_for_segments(
+            segments, args.voice_id, VOICE_SETTINGS
+        )
 
-            # 5. Create final video
-            create_final_video(
-                input_video, voiceover_track, output_video, args.srt, srt_path
-            )
+        if not tts_clips_info:
+            print("No TTS clips were generated. The final video will be silent.")
+
+        # 4. Combine TTS audio segments into a single voiceover track
+        video_duration = probe_duration(input_video)
+        voiceover_track = create_composite_voiceover(tts_clips_info, video_duration)
+
+        # The subtitles are burned in below, so the SRT must be written by now
+        if srt_future is not None:
+            srt_future.result()
+
+        # 5. Create final video
+        create_final_video(
+            input_video,
+            voiceover_track,
+            output_video,
+            args.srt,
+            srt_path,
+            video_encoder=args.encoder,
+        )
 
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            sys.exit(1)
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
 
     print(f"Processing finished. Output video: {output_video}")
@@ -92,6 +92,22 @@ export const fetchJob = async (jobId) => {
   return response.json();
 };
 
+/**
+ * Fetch the large, rarely changing fields of a job, such as its transcription
+ * @param {string} jobId - The job ID
+ * @returns {Promise<Object>} - Job payload
+ */
+export const fetchJobPayload = async (jobId) => {
+  const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/payload`);
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch job payload');
+  }
+  
+  return response.json();
+};
+
 /**
  * Update the transcription for a job
  * @param {string} jobId - The job ID
@@ -206,6 +222,8 @@ export const createJobWebSocket = (jobId, onMessage, onClose) => {
   let reconnectTimeout = null;
   let pingInterval = null;
   let lastMessageTime = Date.now();
+  // Revision of the last full job state received from the server
+  let lastRev = -1;
   
   // Function to handle reconnection
   const reconnect = () => {
@@ -325,14 +343,22 @@ export const createJobWebSocket = (jobId, onMessage, onClose) => {
           onMessage(statusUpdate);
         }
         
+        // Ask for the full job state if we missed an update
+        if (data.rev !== undefined && data.rev > lastRev) {
+          console.log(`Job ${jobId} revision ${data.rev} is newer than ${lastRev}, requesting resync`);
+          socket.send(JSON.stringify({ action: 'resync' }));
+        }
+        
         return;
       }
       
       console.log(`WebSocket message received for job ${jobId}:`, data);
       
+      if (data._rev !== undefined) lastRev = data._rev;
+      
       // Ensure we have at least the minimal fields needed
       if (!data.job_id) data.job_id = jobId;
-      if (data.progress === undefined) data.progress = 0;
+      if (data.progress === undefined && data.type !== 'payload') data.progress = 0;
       
       // Call the message handler
       onMessage(data);